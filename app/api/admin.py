@@ -1,11 +1,14 @@
 """
 Administrative API endpoints for system management and analytics
 """
-from typing import Optional, List, Dict, Any
+from typing import Literal, Optional, List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, lambda_stmt, select, text
+from sqlalchemy.orm import Session, load_only, raiseload
 from datetime import datetime, timedelta
-import io
+import asyncio
+import time
 import csv
 import json
 
@@ -13,14 +16,30 @@ from app.database import get_db
 from app.services.monitoring_service import MonitoringService
 from app.services.billing_service import BillingService
 from app.api.dependencies import get_current_user
+from app.api.responses import ORJSONResponse
 from app.models import User, ModelInteraction, CreditTransaction
-from app.models.crud import UserCRUD, ModelInteractionCRUD, CreditTransactionCRUD
+from app.utils.cache import get_cache
 from app.utils.logging import get_logger
 
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], default_response_class=ORJSONResponse)
 logger = get_logger(__name__)
 
+# Usernames and emails granted admin privileges
+ADMIN_IDENTIFIERS = frozenset({"admin", "administrator", "admin@example.com"})
+
+# Exact user counts for search terms are cached briefly
+USERS_COUNT_CACHE_TTL = 60
+
+# Dashboard cache TTL bounds (seconds) and how long a stale copy is kept
+DASHBOARD_CACHE_MIN_TTL = 10
+DASHBOARD_CACHE_MAX_TTL = 60
+DASHBOARD_STALE_TTL = 600
+
+# Response keys for the dashboard's recent activity rows (in column order)
+RECENT_INTERACTION_KEYS = ("id", "user_id", "model", "credits", "timestamp")
+RECENT_USER_KEYS = ("id", "username", "email", "credits", "created_at")
+
 
 def get_monitoring_service(db: Session = Depends(get_db)) -> MonitoringService:
     """Get MonitoringService instance"""
@@ -36,9 +55,7 @@ def verify_admin_user(current_user: User = Depends(get_current_user)) -> User:
     """Verify that current user has admin privileges"""
     # For now, check if user is admin by username or email
     # In production, you'd have proper role-based access control
-    admin_users = ["admin", "administrator", "admin@example.com"]
-    
-    if current_user.username not in admin_users and current_user.email not in admin_users:
+    if current_user.username not in ADMIN_IDENTIFIERS and current_user.email not in ADMIN_IDENTIFIERS:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
@@ -55,37 +72,37 @@ async def get_admin_dashboard(
     db: Session = Depends(get_db)
 ):
     """Get comprehensive admin dashboard data"""
+    cache = get_cache()
+    cache_key = f"admin:dashboard:{days}"
+    stale_key = f"{cache_key}:stale"
+    
+    # The cache may be Redis, whose client blocks, so it is used from worker threads
+    cached = await asyncio.to_thread(cache.get, cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+    
     try:
-        # System health and metrics
-        health_status = monitoring_service.get_health_status()
-        system_metrics = monitoring_service.get_system_metrics()
-        
-        # Usage analytics
-        usage_analytics = monitoring_service.get_usage_analytics(days)
-        
-        # User statistics
-        total_users = db.query(User).count()
-        active_users_count = len(set(
-            interaction.user_id for interaction in 
-            ModelInteractionCRUD.get_recent(db, days=days)
-        ))
-        
-        # Credit statistics
-        total_credits_added = db.query(CreditTransaction).filter(
-            CreditTransaction.transaction_type == "add",
-            CreditTransaction.created_at >= datetime.utcnow() - timedelta(days=days)
-        ).count()
-        
-        total_credits_spent = db.query(CreditTransaction).filter(
-            CreditTransaction.transaction_type == "charge",
-            CreditTransaction.created_at >= datetime.utcnow() - timedelta(days=days)
-        ).count()
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        cutoff = now - timedelta(days=days)
+        
+        # System metrics sample CPU for a second, so they are collected in a
+        # worker thread alongside the database queries. The queries share one
+        # session and therefore stay sequential within their own thread.
+        system_metrics, (usage_analytics, stats, recent_interactions, recent_users) = (
+            await asyncio.gather(
+                asyncio.to_thread(monitoring_service.get_system_metrics),
+                asyncio.to_thread(_load_dashboard_data, db, monitoring_service, days, cutoff)
+            )
+        )
+        health_status = monitoring_service.get_health_status(system_metrics)
         
-        # Recent activity
-        recent_interactions = ModelInteractionCRUD.get_recent(db, limit=10)
-        recent_users = UserCRUD.get_recent(db, limit=10)
+        total_users = stats.total_users or 0
+        active_users_count = stats.active_users or 0
+        total_credits_added = stats.credits_added or 0
+        total_credits_spent = stats.credits_spent or 0
         
-        return {
+        dashboard = {
             "success": True,
             "dashboard": {
                 "period_days": days,
@@ -106,43 +123,91 @@ async def get_admin_dashboard(
                     "net_flow": total_credits_added - total_credits_spent
                 },
                 "recent_activity": {
-                    "interactions": [
-                        {
-                            "id": interaction.id,
-                            "user_id": interaction.user_id,
-                            "model": interaction.model_name,
-                            "credits": interaction.credits_charged,
-                            "timestamp": interaction.created_at.isoformat()
-                        }
-                        for interaction in recent_interactions
-                    ],
-                    "new_users": [
-                        {
-                            "id": user.id,
-                            "username": user.username,
-                            "email": user.email,
-                            "credits": user.credits,
-                            "created_at": user.created_at.isoformat()
-                        }
-                        for user in recent_users
-                    ]
+                    "interactions": [dict(zip(RECENT_INTERACTION_KEYS, row)) for row in recent_interactions],
+                    "new_users": [dict(zip(RECENT_USER_KEYS, row)) for row in recent_users]
                 }
             }
         }
         
+        # Slower dashboards are cached longer
+        elapsed = time.perf_counter() - started
+        ttl = min(DASHBOARD_CACHE_MAX_TTL, max(DASHBOARD_CACHE_MIN_TTL, int(elapsed * 5)))
+        await asyncio.to_thread(cache.set, cache_key, dashboard, ttl)
+        await asyncio.to_thread(cache.set, stale_key, dashboard, DASHBOARD_STALE_TTL)
+        
+        return ORJSONResponse(dashboard)
+        
     except Exception as e:
         logger.error("admin_dashboard_failed", admin_id=admin_user.id, error=str(e))
+        
+        # Serve the last known dashboard rather than failing
+        stale = await asyncio.to_thread(cache.get, stale_key)
+        if stale is not None:
+            logger.warning("admin_dashboard_served_stale", admin_id=admin_user.id, days=days)
+            return ORJSONResponse(stale)
+        
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to load admin dashboard"
         )
 
 
+def _load_dashboard_data(db: Session, monitoring_service: MonitoringService, days: int, cutoff: datetime):
+    """Run the dashboard's database queries"""
+    # Usage analytics
+    usage_analytics = monitoring_service.get_usage_analytics(days)
+    
+    # User and credit statistics in a single round-trip
+    stats = db.execute(_dashboard_stats_stmt(cutoff)).one()
+    
+    # Recent activity as plain column rows
+    recent_interactions = (
+        db.query(
+            ModelInteraction.id,
+            ModelInteraction.user_id,
+            ModelInteraction.model_name,
+            ModelInteraction.credits_charged,
+            ModelInteraction.created_at
+        )
+        .order_by(ModelInteraction.created_at.desc())
+        .limit(10)
+        .all()
+    )
+    recent_users = (
+        db.query(User.id, User.username, User.email, User.credits, User.created_at)
+        .order_by(User.created_at.desc())
+        .limit(10)
+        .all()
+    )
+    
+    return usage_analytics, stats, recent_interactions, recent_users
+
+
+def _dashboard_stats_stmt(cutoff: datetime):
+    """
+    Build the dashboard statistics statement
+    The lambda is compiled once; later calls only bind a new cutoff
+    """
+    # Both credit counters come from a single scan of the period
+    return lambda_stmt(lambda: select(
+        select(func.count(User.id))
+        .scalar_subquery()
+        .label("total_users"),
+        select(func.count(func.distinct(ModelInteraction.user_id)))
+        .where(ModelInteraction.created_at >= cutoff)
+        .scalar_subquery()
+        .label("active_users"),
+        func.count(case((CreditTransaction.transaction_type == "add", 1))).label("credits_added"),
+        func.count(case((CreditTransaction.transaction_type == "charge", 1))).label("credits_spent")
+    ).where(CreditTransaction.created_at >= cutoff))
+
+
 @router.get("/users")
-async def get_users_list(
+def get_users_list(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     search: Optional[str] = Query(None, description="Search by username or email"),
+    after_id: Optional[int] = Query(None, ge=0, description="Return users after this ID (keyset pagination)"),
     admin_user: User = Depends(verify_admin_user),
     db: Session = Depends(get_db)
 ):
@@ -160,51 +225,76 @@ async def get_users_list(
                 (User.email.ilike(search_term))
             )
         
-        # Get total count
-        total_count = query.count()
+        # Get total count (estimated for unfiltered lists)
+        total_count = _count_users(db, query, search)
+        
+        # Per-user interaction statistics aggregated in a single subquery
+        stats = (
+            db.query(
+                ModelInteraction.user_id.label("user_id"),
+                func.count(ModelInteraction.id).label("total_interactions"),
+                func.sum(ModelInteraction.credits_charged).label("total_spent")
+            )
+            .group_by(ModelInteraction.user_id)
+            .subquery()
+        )
+        
+        query = (
+            query.add_columns(
+                func.coalesce(stats.c.total_interactions, 0),
+                func.coalesce(stats.c.total_spent, 0)
+            )
+            .outerjoin(stats, stats.c.user_id == User.id)
+            .options(raiseload("*"))
+            .order_by(User.id)
+        )
+        
+        # Keyset pagination avoids scanning skipped rows
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        else:
+            query = query.offset(skip)
         
-        # Get users with pagination
-        users = query.offset(skip).limit(page_size).all()
+        # Get users with pagination and their statistics in one round-trip
+        rows = query.limit(page_size).all()
         
         # Format response
         users_data = []
-        for user in users:
-            # Get user statistics
-            user_interactions = db.query(ModelInteraction).filter(
-                ModelInteraction.user_id == user.id
-            ).count()
-            
-            total_spent = sum(
-                interaction.credits_charged for interaction in
-                db.query(ModelInteraction).filter(
-                    ModelInteraction.user_id == user.id
-                ).all()
-            )
-            
+        for user, user_interactions, total_spent in rows:
             users_data.append({
                 "id": user.id,
                 "username": user.username,
                 "email": user.email,
                 "credits": user.credits,
-                "created_at": user.created_at.isoformat(),
-            "is_active": True,
+                "created_at": user.created_at,
+                "is_active": True,
                 "statistics": {
                     "total_interactions": user_interactions,
                     "total_credits_spent": total_spent
                 }
             })
         
-        return {
-            "success": True,
-            "users": users_data,
-            "pagination": {
+        if after_id is not None:
+            pagination = {
+                "after_id": after_id,
+                "page_size": page_size,
+                "total": total_count,
+                "next_cursor": users_data[-1]["id"] if len(users_data) == page_size else None
+            }
+        else:
+            pagination = {
                 "page": page,
                 "page_size": page_size,
                 "total": total_count,
                 "pages": (total_count + page_size - 1) // page_size
-            },
+            }
+        
+        return ORJSONResponse({
+            "success": True,
+            "users": users_data,
+            "pagination": pagination,
             "search": search
-        }
+        })
         
     except Exception as e:
         logger.error("admin_users_list_failed", admin_id=admin_user.id, error=str(e))
@@ -214,6 +304,33 @@ async def get_users_list(
         )
 
 
+def _count_users(db: Session, query, search: Optional[str]) -> int:
+    """
+    Count users for pagination
+    Uses the PostgreSQL planner estimate for unfiltered lists and caches
+    exact counts for search terms
+    """
+    if not search:
+        if db.bind.dialect.name == "postgresql":
+            estimate = db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+                {"table": User.__tablename__}
+            ).scalar()
+            # reltuples is -1 until the table has been analyzed
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+        return query.count()
+    
+    cache = get_cache()
+    cache_key = f"admin:users_count:{search.lower()}"
+    total_count = cache.get(cache_key)
+    if total_count is None:
+        total_count = query.count()
+        cache.set(cache_key, total_count, USERS_COUNT_CACHE_TTL)
+    
+    return total_count
+
+
 @router.get("/users/{user_id}")
 async def get_user_details(
     user_id: int,
@@ -222,37 +339,81 @@ async def get_user_details(
 ):
     """Get detailed information about a specific user"""
     try:
-        # Get user
-        user = UserCRUD.get(db, user_id)
+        # Get user (relationships are never navigated here)
+        user = (
+            db.query(User)
+            .options(raiseload("*"))
+            .filter(User.id == user_id)
+            .first()
+        )
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        # Get user interactions
-        interactions = ModelInteractionCRUD.get_by_user(db, user_id, skip=0, limit=50)
+        # Get the displayed interactions without the prompt/response text columns
+        interactions = (
+            db.query(ModelInteraction)
+            .options(
+                load_only(
+                    ModelInteraction.id,
+                    ModelInteraction.model_name,
+                    ModelInteraction.credits_charged,
+                    ModelInteraction.processing_time_ms,
+                    ModelInteraction.created_at
+                ),
+                raiseload("*")
+            )
+            .filter(ModelInteraction.user_id == user_id)
+            .order_by(ModelInteraction.created_at.desc())
+            .limit(10)
+            .all()
+        )
         
-        # Get credit transactions
-        credit_transactions = CreditTransactionCRUD.get_by_user(db, user_id, skip=0, limit=50)
+        # Get the credit transactions that are displayed
+        credit_transactions = (
+            db.query(CreditTransaction)
+            .options(
+                load_only(
+                    CreditTransaction.id,
+                    CreditTransaction.transaction_type,
+                    CreditTransaction.amount,
+                    CreditTransaction.description,
+                    CreditTransaction.created_at
+                ),
+                raiseload("*")
+            )
+            .filter(CreditTransaction.user_id == user_id)
+            .order_by(CreditTransaction.created_at.desc())
+            .limit(10)
+            .all()
+        )
         
-        # Calculate statistics
-        total_interactions = len(interactions)
-        total_credits_spent = sum(i.credits_charged for i in interactions)
+        # Calculate statistics per model over the full history
+        usage_rows = (
+            db.query(
+                ModelInteraction.model_name,
+                func.count(ModelInteraction.id),
+                func.coalesce(func.sum(ModelInteraction.credits_charged), 0)
+            )
+            .filter(ModelInteraction.user_id == user_id)
+            .group_by(ModelInteraction.model_name)
+            .all()
+        )
         
-        model_usage = {}
-        for interaction in interactions:
-            model = interaction.model_name
-            model_usage[model] = model_usage.get(model, 0) + 1
+        model_usage = {model: count for model, count, _ in usage_rows}
+        total_interactions = sum(model_usage.values())
+        total_credits_spent = sum(spent for _, _, spent in usage_rows)
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "user": {
                 "id": user.id,
                 "username": user.username,
                 "email": user.email,
                 "credits": user.credits,
-                "created_at": user.created_at.isoformat(),
+                "created_at": user.created_at,
                 "is_active": True
             },
             "statistics": {
@@ -266,9 +427,9 @@ async def get_user_details(
                     "model": interaction.model_name,
                     "credits": interaction.credits_charged,
                     "processing_time_ms": interaction.processing_time_ms,
-                    "timestamp": interaction.created_at.isoformat()
+                    "timestamp": interaction.created_at
                 }
-                for interaction in interactions[:10]
+                for interaction in interactions
             ],
             "credit_transactions": [
                 {
@@ -276,11 +437,11 @@ async def get_user_details(
                     "type": transaction.transaction_type,
                     "amount": transaction.amount,
                     "description": transaction.description,
-                    "timestamp": transaction.created_at.isoformat()
+                    "timestamp": transaction.created_at
                 }
-                for transaction in credit_transactions[:10]
+                for transaction in credit_transactions
             ]
-        }
+        })
         
     except HTTPException:
         raise
@@ -357,56 +518,34 @@ async def adjust_user_credits(
 @router.get("/reports/usage")
 async def generate_usage_report(
     days: int = Query(30, ge=1, le=365, description="Number of days for report"),
-    format: str = Query("json", regex="^(json|csv)$", description="Report format"),
+    format: Literal["json", "csv"] = Query("json", description="Report format"),
     admin_user: User = Depends(verify_admin_user),
     monitoring_service: MonitoringService = Depends(get_monitoring_service)
 ):
     """Generate detailed usage report"""
     try:
+        now = datetime.utcnow()
+        
         # Get comprehensive analytics
         analytics = monitoring_service.get_usage_analytics(days)
         
         if format == "json":
-            return {
+            return ORJSONResponse({
                 "success": True,
                 "report": analytics,
-                "generated_at": datetime.utcnow().isoformat(),
+                "generated_at": now,
                 "period_days": days
-            }
+            })
         
         elif format == "csv":
-            # Generate CSV report
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Write headers and data
-            writer.writerow(["Report Type", "Usage Report"])
-            writer.writerow(["Generated At", datetime.utcnow().isoformat()])
-            writer.writerow(["Period (days)", days])
-            writer.writerow([])
-            
-            # Model usage
-            writer.writerow(["Model Usage"])
-            writer.writerow(["Model", "Interactions", "Credits Used", "Avg Time (ms)"])
-            
-            models_data = analytics.get("models", {}).get("by_model", {})
-            for model_name, stats in models_data.items():
-                writer.writerow([
-                    model_name,
-                    stats.get("count", 0),
-                    stats.get("credits_used", 0),
-                    stats.get("avg_processing_time_ms", 0)
-                ])
+            # Stream CSV report row by row
+            filename = f"usage_report_{now.strftime('%Y%m%d_%H%M%S')}.csv"
             
-            csv_content = output.getvalue()
-            output.close()
-            
-            return {
-                "success": True,
-                "format": "csv",
-                "content": csv_content,
-                "filename": f"usage_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            }
+            return StreamingResponse(
+                _iter_usage_report_csv(analytics, days, now),
+                media_type="text/csv",
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+            )
         
     except Exception as e:
         logger.error("admin_usage_report_failed", admin_id=admin_user.id, error=str(e))
@@ -416,6 +555,35 @@ async def generate_usage_report(
         )
 
 
+class _CSVLine:
+    """File-like object whose write() hands back the formatted CSV line"""
+    
+    def write(self, value: str) -> str:
+        return value
+
+
+def _iter_usage_report_csv(analytics: Dict[str, Any], days: int, generated_at: datetime):
+    """Yield usage report CSV lines"""
+    writer = csv.writer(_CSVLine())
+    
+    yield writer.writerow(["Report Type", "Usage Report"])
+    yield writer.writerow(["Generated At", generated_at.isoformat()])
+    yield writer.writerow(["Period (days)", days])
+    yield writer.writerow([])
+    
+    # Model usage
+    yield writer.writerow(["Model Usage"])
+    yield writer.writerow(["Model", "Interactions", "Credits Used", "Avg Time (ms)"])
+    
+    for stats in analytics.get("model_statistics", []):
+        yield writer.writerow([
+            stats.get("model_name"),
+            stats.get("total_requests", 0),
+            stats.get("total_credits", 0),
+            stats.get("avg_processing_time_ms", 0)
+        ])
+
+
 @router.get("/reports/financial")
 async def generate_financial_report(
     days: int = Query(30, ge=1, le=365, description="Number of days for report"),
@@ -427,72 +595,87 @@ async def generate_financial_report(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Get all credit transactions in period
-        transactions = db.query(CreditTransaction).filter(
+        in_period = (
             CreditTransaction.created_at >= start_date,
             CreditTransaction.created_at <= end_date
-        ).all()
-        
-        # Analyze transactions
-        credits_added = sum(t.amount for t in transactions if t.transaction_type == "add")
-        credits_spent = sum(abs(t.amount) for t in transactions if t.transaction_type == "charge")
-        
-        # Daily breakdown
-        daily_stats = {}
-        for transaction in transactions:
-            date_key = transaction.created_at.date().isoformat()
-            if date_key not in daily_stats:
-                daily_stats[date_key] = {"added": 0, "spent": 0, "transactions": 0}
-            
-            daily_stats[date_key]["transactions"] += 1
-            if transaction.transaction_type == "add":
-                daily_stats[date_key]["added"] += transaction.amount
-            else:
-                daily_stats[date_key]["spent"] += abs(transaction.amount)
-        
-        # User spending analysis
-        user_spending = {}
-        for transaction in transactions:
-            if transaction.transaction_type == "charge":
-                user_id = transaction.user_id
-                user_spending[user_id] = user_spending.get(user_id, 0) + abs(transaction.amount)
+        )
+        is_add = CreditTransaction.transaction_type == "add"
+        
+        # Summary by transaction type
+        type_totals = {
+            row.transaction_type: row
+            for row in db.query(
+                CreditTransaction.transaction_type,
+                func.sum(func.abs(CreditTransaction.amount)).label("total"),
+                func.count(CreditTransaction.id).label("transactions")
+            )
+            .filter(*in_period)
+            .group_by(CreditTransaction.transaction_type)
+            .all()
+        }
+        credits_added = int(type_totals["add"].total) if "add" in type_totals else 0
+        credits_spent = int(type_totals["charge"].total) if "charge" in type_totals else 0
+        total_transactions = sum(row.transactions for row in type_totals.values())
+        
+        # Daily breakdown (everything that is not an addition counts as spent)
+        day = func.date(CreditTransaction.created_at).label("date")
+        daily_rows = (
+            db.query(
+                day,
+                func.sum(case((is_add, CreditTransaction.amount), else_=0)).label("added"),
+                func.sum(case((is_add, 0), else_=func.abs(CreditTransaction.amount))).label("spent"),
+                func.count(CreditTransaction.id).label("transactions")
+            )
+            .filter(*in_period)
+            .group_by(day)
+            .order_by(day)
+            .all()
+        )
         
         # Top spenders
-        top_spenders = sorted(user_spending.items(), key=lambda x: x[1], reverse=True)[:10]
+        spent = func.sum(func.abs(CreditTransaction.amount)).label("spent")
+        top_spenders = (
+            db.query(CreditTransaction.user_id, spent)
+            .filter(*in_period, CreditTransaction.transaction_type == "charge")
+            .group_by(CreditTransaction.user_id)
+            .order_by(spent.desc())
+            .limit(10)
+            .all()
+        )
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "report": {
                 "period": {
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat(),
+                    "start_date": start_date,
+                    "end_date": end_date,
                     "days": days
                 },
                 "summary": {
                     "total_credits_added": credits_added,
                     "total_credits_spent": credits_spent,
                     "net_flow": credits_added - credits_spent,
-                    "total_transactions": len(transactions)
+                    "total_transactions": total_transactions
                 },
                 "daily_breakdown": [
                     {
-                        "date": date,
-                        "credits_added": stats["added"],
-                        "credits_spent": stats["spent"],
-                        "net_flow": stats["added"] - stats["spent"],
-                        "transactions": stats["transactions"]
+                        "date": row.date,
+                        "credits_added": int(row.added or 0),
+                        "credits_spent": int(row.spent or 0),
+                        "net_flow": int((row.added or 0) - (row.spent or 0)),
+                        "transactions": row.transactions
                     }
-                    for date, stats in sorted(daily_stats.items())
+                    for row in daily_rows
                 ],
                 "top_spenders": [
                     {
                         "user_id": user_id,
-                        "credits_spent": amount
+                        "credits_spent": int(amount)
                     }
                     for user_id, amount in top_spenders
                 ]
             }
-        }
+        })
         
     except Exception as e:
         logger.error("admin_financial_report_failed", admin_id=admin_user.id, error=str(e))
@@ -509,20 +692,22 @@ async def get_system_status(
 ):
     """Get detailed system status for admin"""
     try:
+        now = datetime.utcnow()
+        
         # Get comprehensive system information
-        health_status = monitoring_service.get_health_status()
         system_metrics = monitoring_service.get_system_metrics()
+        health_status = monitoring_service.get_health_status(system_metrics)
         performance_metrics = monitoring_service.get_performance_metrics()
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "system_status": {
                 "health": health_status,
                 "metrics": system_metrics,
                 "performance": performance_metrics,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": now
             }
-        }
+        })
         
     except Exception as e:
         logger.error("admin_system_status_failed", admin_id=admin_user.id, error=str(e))
@@ -39,16 +39,9 @@ async def register(
     if not success:
         return RegisterResponse(success=False, message=message)
     
-    user_info = UserInfoResponse(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        credits=user.credits,
-        created_at=user.created_at.isoformat(),
-        updated_at=user.updated_at.isoformat()
-    )
+    user_info = UserInfoResponse.model_validate(user)
     
-    return RegisterResponse(
+    return RegisterResponse.model_construct(
         success=True,
         message=message,
         data=user_info
@@ -76,21 +69,14 @@ async def login(
     if not session_success:
         return LoginResponse(success=False, message=session_message)
     
-    user_info = UserInfoResponse(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        credits=user.credits,
-        created_at=user.created_at.isoformat(),
-        updated_at=user.updated_at.isoformat()
-    )
+    user_info = UserInfoResponse.model_validate(user)
     
-    token_response = TokenResponse(
+    token_response = TokenResponse.model_construct(
         access_token=token,
         user=user_info
     )
     
-    return LoginResponse(
+    return LoginResponse.model_construct(
         success=True,
         message="Login successful",
         data=token_response
@@ -105,7 +91,7 @@ async def logout(
     """Logout current user"""
     # Note: In a real implementation, we'd need to get the token from the request
     # For now, we'll just return success
-    return SuccessResponse(
+    return SuccessResponse.model_construct(
         success=True,
         message="Logout successful"
     )
@@ -116,14 +102,7 @@ async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user information"""
-    return UserInfoResponse(
-        id=current_user.id,
-        username=current_user.username,
-        email=current_user.email,
-        credits=current_user.credits,
-        created_at=current_user.created_at.isoformat(),
-        updated_at=current_user.updated_at.isoformat()
-    )
+    return UserInfoResponse.model_validate(current_user)
 
 
 @router.get("/credits", response_model=CreditsResponse)
@@ -131,7 +110,7 @@ async def get_credits(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user credits"""
-    return CreditsResponse(
+    return CreditsResponse.model_construct(
         credits=current_user.credits,
         message=f"You have {current_user.credits} credits"
     )
@@ -144,17 +123,15 @@ async def add_credits(
     user_service: UserService = Depends(get_user_service)
 ):
     """Add credits to current user account"""
-    new_credits = current_user.credits + request.amount
-    
-    success = user_service.update_user_credits(current_user.id, new_credits)
+    new_credits = user_service.add_credits(current_user.id, request.amount)
     
-    if not success:
+    if new_credits is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to add credits"
         )
     
-    return CreditsResponse(
+    return CreditsResponse.model_construct(
         credits=new_credits,
         message=f"Added {request.amount} credits. New balance: {new_credits}"
     )
\ No newline at end of file
@@ -1,23 +1,31 @@
 """
 Billing API endpoints
 """
+from dataclasses import dataclass
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.services.billing_service import BillingService
 from app.api.dependencies import get_current_user
+from app.api.responses import ORJSONResponse, etag_response
 from app.api.schemas import (
     AddCreditsRequest,
     CreditsResponse,
     SuccessResponse
 )
 from app.models import User
-from pydantic import BaseModel
+from app.utils.cache import get_cache
+from pydantic import BaseModel, ConfigDict
 
 
-router = APIRouter(prefix="/billing", tags=["billing"])
+router = APIRouter(prefix="/billing", tags=["billing"], default_response_class=ORJSONResponse)
+
+# Model prices come from settings and only change on restart
+MODEL_COST_CACHE_TTL = 3600
+MODEL_COST_MAX_AGE = 300
 
 
 # Additional schemas for billing
@@ -27,10 +35,9 @@ class TransactionResponse(BaseModel):
     amount: int
     transaction_type: str
     description: str
-    created_at: str
+    created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TransactionHistoryResponse(BaseModel):
@@ -39,6 +46,17 @@ class TransactionHistoryResponse(BaseModel):
     total_count: int
 
 
+@dataclass
+class TransactionItem:
+    """Transaction row as sent to clients (serialized directly by orjson)"""
+    __slots__ = ("id", "amount", "transaction_type", "description", "created_at")
+    id: int
+    amount: int
+    transaction_type: str
+    description: str
+    created_at: datetime
+
+
 class TransactionSummaryResponse(BaseModel):
     """Transaction summary response"""
     total_transactions: int
@@ -67,7 +85,7 @@ def get_billing_service(db: Session = Depends(get_db)) -> BillingService:
 
 
 @router.get("/balance", response_model=CreditsResponse)
-async def get_balance(
+def get_balance(
     current_user: User = Depends(get_current_user),
     billing_service: BillingService = Depends(get_billing_service)
 ):
@@ -80,14 +98,14 @@ async def get_balance(
             detail="User not found"
         )
     
-    return CreditsResponse(
-        credits=balance,
-        message=f"Current balance: {balance} credits"
-    )
+    return ORJSONResponse({
+        "credits": balance,
+        "message": f"Current balance: {balance} credits"
+    })
 
 
 @router.post("/add", response_model=CreditsResponse)
-async def add_credits(
+def add_credits(
     request: AddCreditsRequest,
     current_user: User = Depends(get_current_user),
     billing_service: BillingService = Depends(get_billing_service)
@@ -105,14 +123,14 @@ async def add_credits(
             detail=message
         )
     
-    return CreditsResponse(
-        credits=new_balance,
-        message=message
-    )
+    return ORJSONResponse({
+        "credits": new_balance,
+        "message": message
+    })
 
 
 @router.post("/charge", response_model=CreditsResponse)
-async def charge_credits(
+def charge_credits(
     request: ChargeCreditsRequest,
     current_user: User = Depends(get_current_user),
     billing_service: BillingService = Depends(get_billing_service)
@@ -130,14 +148,14 @@ async def charge_credits(
             detail=message
         )
     
-    return CreditsResponse(
-        credits=remaining,
-        message=message
-    )
+    return ORJSONResponse({
+        "credits": remaining,
+        "message": message
+    })
 
 
 @router.post("/refund", response_model=CreditsResponse)
-async def refund_credits(
+def refund_credits(
     request: RefundCreditsRequest,
     current_user: User = Depends(get_current_user),
     billing_service: BillingService = Depends(get_billing_service)
@@ -155,84 +173,103 @@ async def refund_credits(
             detail=message
         )
     
-    return CreditsResponse(
-        credits=new_balance,
-        message=message
-    )
+    return ORJSONResponse({
+        "credits": new_balance,
+        "message": message
+    })
 
 
-@router.get("/transactions", response_model=TransactionHistoryResponse)
-async def get_transactions(
+@router.get(
+    "/transactions",
+    response_model=None,
+    responses={200: {"model": TransactionHistoryResponse}}
+)
+def get_transactions(
     skip: int = Query(0, ge=0, description="Number of transactions to skip"),
     limit: int = Query(50, ge=1, le=100, description="Number of transactions to return"),
     current_user: User = Depends(get_current_user),
     billing_service: BillingService = Depends(get_billing_service)
-):
+) -> ORJSONResponse:
     """Get current user transaction history"""
-    transactions = billing_service.get_user_transactions(
+    transactions, total_count = billing_service.get_user_transactions(
         user_id=current_user.id,
         skip=skip,
         limit=limit
     )
     
-    transaction_responses = [
-        TransactionResponse(
-            id=t.id,
-            amount=t.amount,
-            transaction_type=t.transaction_type,
-            description=t.description or "",
-            created_at=t.created_at.isoformat()
-        )
+    # Rows come straight from the database, so they are not validated;
+    # TransactionItem fields match TransactionResponse and orjson formats created_at
+    items = [
+        TransactionItem(t.id, t.amount, t.transaction_type, t.description or "", t.created_at)
         for t in transactions
     ]
     
-    return TransactionHistoryResponse(
-        transactions=transaction_responses,
-        total_count=len(transaction_responses)
-    )
+    return ORJSONResponse({
+        "transactions": items,
+        "total_count": total_count
+    })
 
 
-@router.get("/summary", response_model=TransactionSummaryResponse)
-async def get_transaction_summary(
+@router.get(
+    "/summary",
+    response_model=None,
+    responses={200: {"model": TransactionSummaryResponse}}
+)
+def get_transaction_summary(
     current_user: User = Depends(get_current_user),
     billing_service: BillingService = Depends(get_billing_service)
-):
+) -> ORJSONResponse:
     """Get current user transaction summary"""
     summary = billing_service.get_transaction_summary(current_user.id)
     
-    return TransactionSummaryResponse(**summary)
+    # Summary dict keys match TransactionSummaryResponse
+    return ORJSONResponse(summary)
 
 
 @router.get("/check/{amount}", response_model=dict)
-async def check_sufficient_credits(
+def check_sufficient_credits(
     amount: int,
     current_user: User = Depends(get_current_user),
     billing_service: BillingService = Depends(get_billing_service)
 ):
     """Check if user has sufficient credits for an amount"""
-    has_sufficient, message = billing_service.check_sufficient_credits(
+    has_sufficient, message, current_balance = billing_service.check_sufficient_credits(
         user_id=current_user.id,
         required_amount=amount
     )
     
-    return {
+    return ORJSONResponse({
         "sufficient": has_sufficient,
         "message": message,
-        "current_balance": billing_service.get_user_balance(current_user.id),
+        "current_balance": current_balance,
         "required_amount": amount
-    }
+    })
 
 
 @router.get("/model-cost/{model_name}", response_model=dict)
-async def get_model_cost(
+def get_model_cost(
     model_name: str,
+    request: Request,
     billing_service: BillingService = Depends(get_billing_service)
 ):
     """Get cost for using a specific model"""
+    # The endpoint is unauthenticated, so only known models are cached;
+    # arbitrary names must not be able to fill or evict cache entries
+    cache = get_cache() if billing_service.is_priced_model(model_name) else None
+    cache_key = f"model_cost:{model_name}"
+    
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        return etag_response(request, cached, max_age=MODEL_COST_MAX_AGE)
+    
     cost = billing_service.get_model_cost(model_name)
     
-    return {
+    payload = {
         "model_name": model_name,
         "cost": cost,
         "description": f"Using {model_name} costs {cost} credit(s)"
-    }
\ No newline at end of file
+    }
+    if cache is not None:
+        cache.set(cache_key, payload, MODEL_COST_CACHE_TTL)
+    
+    return etag_response(request, payload, max_age=MODEL_COST_MAX_AGE)
\ No newline at end of file
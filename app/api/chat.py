@@ -1,8 +1,12 @@
 """
 Chat API endpoints integrating ML service with billing
 """
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
@@ -11,15 +15,20 @@ from app.services.chat_service import ChatService
 from app.ml.ml_service import MLService
 from app.api.ml import ml_service  # Use the same MLService instance initialized on startup
 from app.api.dependencies import get_current_user
+from app.api.responses import ORJSONResponse, etag_response
 from app.models import User
+from app.utils.cache import get_cache
 from app.utils.logging import get_logger
 
 
-router = APIRouter(prefix="/chat", tags=["chat"])
+router = APIRouter(prefix="/chat", tags=["chat"], default_response_class=ORJSONResponse)
 logger = get_logger(__name__)
 
 # Global ML service instance is imported from app.api.ml
 
+# Model cost estimates are cached per set of available models
+MODEL_COSTS_CACHE_TTL = 3600
+
 
 class ChatRequest(BaseModel):
     """Chat request with model selection"""
@@ -49,7 +58,7 @@ class ChatHistoryItem(BaseModel):
     model_name: str
     credits_charged: int
     processing_time_ms: Optional[int]
-    created_at: str
+    created_at: datetime
 
 
 class ChatHistoryResponse(BaseModel):
@@ -60,13 +69,29 @@ class ChatHistoryResponse(BaseModel):
     page_size: int
 
 
+@dataclass
+class ChatHistoryEntry:
+    """Chat history row as sent to clients (serialized directly by orjson)"""
+    __slots__ = (
+        "id", "prompt", "response", "model_name",
+        "credits_charged", "processing_time_ms", "created_at"
+    )
+    id: int
+    prompt: str
+    response: str
+    model_name: str
+    credits_charged: int
+    processing_time_ms: Optional[int]
+    created_at: datetime
+
+
 def get_chat_service(db: Session = Depends(get_db)) -> ChatService:
     """Get ChatService instance"""
     return ChatService(db, ml_service)
 
 
 @router.post("/message", response_model=ChatResponse)
-async def send_message(
+def send_message(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
     chat_service: ChatService = Depends(get_chat_service)
@@ -95,35 +120,79 @@ async def send_message(
     )
     
     if not success:
-        # Determine appropriate HTTP status code
-        if "not available" in response_or_error.lower():
-            status_code = status.HTTP_503_SERVICE_UNAVAILABLE
-        elif "insufficient credits" in response_or_error.lower() or "billing error" in response_or_error.lower():
-            status_code = status.HTTP_402_PAYMENT_REQUIRED
-        elif "invalid" in response_or_error.lower() or "validation" in response_or_error.lower():
-            status_code = status.HTTP_400_BAD_REQUEST
-        else:
-            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-        
         raise HTTPException(
-            status_code=status_code,
+            status_code=_error_status_code(response_or_error),
             detail=response_or_error
         )
     
     # Return successful response
-    return ChatResponse(
-        success=True,
-        message=response_or_error,
-        model_used=metadata.get("model_used", request.model),
-        credits_charged=metadata.get("credits_charged", 0),
-        remaining_credits=metadata.get("remaining_credits", current_user.credits),
-        processing_time_ms=metadata.get("processing_time_ms", 0),
-        interaction_id=metadata.get("interaction_id")
+    return ORJSONResponse({
+        "success": True,
+        "message": response_or_error,
+        "model_used": metadata.get("model_used", request.model),
+        "credits_charged": metadata.get("credits_charged", 0),
+        "remaining_credits": metadata.get("remaining_credits", current_user.credits),
+        "processing_time_ms": metadata.get("processing_time_ms", 0),
+        "interaction_id": metadata.get("interaction_id")
+    })
+
+
+@router.post("/stream")
+def stream_message(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    Send a message and stream the AI response as Server-Sent Events
+    Credits are charged before generation and refunded if it fails;
+    the final event carries credits_charged and remaining_credits
+    """
+    
+    success, error, events = chat_service.stream_message(
+        user=current_user,
+        message=request.message,
+        model_name=request.model,
+        max_length=request.max_length,
+        temperature=request.temperature
     )
+    
+    if not success:
+        raise HTTPException(
+            status_code=_error_status_code(error),
+            detail=error
+        )
+    
+    # Sync generator is iterated in the threadpool, off the event loop
+    def event_stream():
+        try:
+            for event in events:
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        finally:
+            # Lets the service record a stream the client cut off
+            events.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _error_status_code(error: str) -> int:
+    """Map a chat service error message to an HTTP status code"""
+    error = error.lower()
+    if "not available" in error:
+        return status.HTTP_503_SERVICE_UNAVAILABLE
+    if "insufficient credits" in error or "billing error" in error:
+        return status.HTTP_402_PAYMENT_REQUIRED
+    if "invalid" in error or "validation" in error:
+        return status.HTTP_400_BAD_REQUEST
+    return status.HTTP_500_INTERNAL_SERVER_ERROR
 
 
 @router.get("/history")
-async def get_chat_history(
+def get_chat_history(
     page: int = 1,
     page_size: int = 20,
     model_name: Optional[str] = None,
@@ -153,19 +222,20 @@ async def get_chat_history(
         )
         
         # Convert to response format
-        history_items = []
-        for item in history_data:
-            history_items.append({
-                "id": item["id"],
-                "prompt": item["prompt"],
-                "response": item["response"],
-                "model_name": item["model"],
-                "credits_charged": item["credits_charged"],
-                "processing_time_ms": item["processing_time_ms"],
-                "created_at": item["timestamp"]
-            })
+        history_items = [
+            ChatHistoryEntry(
+                item["id"],
+                item["prompt"],
+                item["response"],
+                item["model"],
+                item["credits_charged"],
+                item["processing_time_ms"],
+                item["timestamp"]
+            )
+            for item in history_data
+        ]
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "history": history_items,
             "total": total_count,
@@ -180,7 +250,7 @@ async def get_chat_history(
                 "date_from": date_from,
                 "date_to": date_to
             }
-        }
+        })
         
     except Exception as e:
         logger.error("chat_history_failed", user_id=current_user.id, error=str(e))
@@ -191,17 +261,17 @@ async def get_chat_history(
 
 
 @router.get("/models")
-async def get_available_models():
+def get_available_models(request: Request):
     """Get available chat models"""
     
     try:
         if not ml_service.models_loaded:
             # Try to get model info without loading
-            return {
+            return etag_response(request, {
                 "available_models": [],
                 "models_loaded": False,
                 "message": "Models not loaded yet. Try sending a message to initialize."
-            }
+            })
         
         available_models = ml_service.get_available_models()
         
@@ -218,11 +288,12 @@ async def get_available_models():
                 "device": info.get("device") if info else "unknown"
             })
         
-        return {
+        # Loaded models can change, so clients revalidate on every call
+        return etag_response(request, {
             "available_models": models_info,
             "models_loaded": True,
             "message": f"Found {len(models_info)} available models"
-        }
+        })
         
     except Exception as e:
         logger.error("get_models_failed", error=str(e))
@@ -233,7 +304,7 @@ async def get_available_models():
 
 
 @router.get("/status")
-async def get_chat_status(
+def get_chat_status(
     current_user: User = Depends(get_current_user),
     chat_service: ChatService = Depends(get_chat_service)
 ):
@@ -246,7 +317,7 @@ async def get_chat_status(
         # Get user's chat statistics
         chat_stats = chat_service.get_user_chat_stats(current_user.id)
         
-        return {
+        return ORJSONResponse({
             "user_id": current_user.id,
             "username": current_user.username,
             "credits": current_user.credits,
@@ -258,7 +329,7 @@ async def get_chat_status(
             },
             "chat_stats": chat_stats,
             "status": "ready" if ml_status["models_loaded"] else "initializing"
-        }
+        })
         
     except Exception as e:
         logger.error("chat_status_failed", user_id=current_user.id, error=str(e))
@@ -269,7 +340,7 @@ async def get_chat_status(
 
 
 @router.get("/stats")
-async def get_user_chat_stats(
+def get_user_chat_stats(
     current_user: User = Depends(get_current_user),
     chat_service: ChatService = Depends(get_chat_service)
 ):
@@ -291,7 +362,7 @@ async def get_user_chat_stats(
 
 
 @router.get("/models/costs")
-async def get_model_costs(
+def get_model_costs(
     chat_service: ChatService = Depends(get_chat_service)
 ):
     """Get cost estimates for all available models"""
@@ -299,15 +370,23 @@ async def get_model_costs(
     try:
         available_models = ml_service.get_available_models()
         
-        model_costs = []
-        for model_name in available_models:
-            cost_info = chat_service.estimate_response_cost(model_name)
-            model_costs.append(cost_info)
+        # Loading or unloading a model changes the key
+        cache = get_cache()
+        cache_key = f"model_costs:{','.join(available_models)}"
         
-        return {
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+        
+        model_costs = chat_service.estimate_response_costs(available_models)
+        
+        payload = {
             "success": True,
             "models": model_costs
         }
+        cache.set(cache_key, payload, MODEL_COSTS_CACHE_TTL)
+        
+        return ORJSONResponse(payload)
         
     except Exception as e:
         logger.error("get_model_costs_failed", error=str(e))
@@ -317,7 +396,7 @@ async def get_model_costs(
         )
 
 @router.get("/model-suggestions")
-async def get_model_suggestions(
+def get_model_suggestions(
     current_user: User = Depends(get_current_user),
     chat_service: ChatService = Depends(get_chat_service)
 ):
@@ -1,9 +1,10 @@
 """
 FastAPI dependencies for authentication and database
 """
+import re
 from typing import Optional
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -11,8 +12,34 @@ from app.services.user_service import UserService
 from app.models import User
 
 
+# Authorization header value carrying a bearer token
+_BEARER_PATTERN = re.compile(r"bearer\s+(.+)", re.IGNORECASE)
+
+
+class BearerToken(HTTPBearer):
+    """
+    Bearer token security scheme
+    Returns the raw token from a single regex match on the Authorization header;
+    registered like HTTPBearer so the OpenAPI docs keep the scheme
+    """
+    
+    async def __call__(self, request: Request) -> Optional[str]:
+        authorization = request.headers.get("authorization")
+        match = _BEARER_PATTERN.fullmatch(authorization) if authorization else None
+        
+        if match is None:
+            if self.auto_error:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authenticated"
+                )
+            return None
+        
+        return match.group(1)
+
+
 # Security scheme for JWT tokens
-security = HTTPBearer()
+security = BearerToken()
 
 
 def get_user_service(db: Session = Depends(get_db)) -> UserService:
@@ -21,13 +48,13 @@ def get_user_service(db: Session = Depends(get_db)) -> UserService:
 
 
 def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request,
+    token: str = Depends(security),
     user_service: UserService = Depends(get_user_service)
 ) -> User:
     """
     Get current authenticated user from JWT token
     """
-    token = credentials.credentials
     user = user_service.get_user_by_token(token)
     
     if user is None:
@@ -37,18 +64,41 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Read back by PerformanceMiddleware when recording the request
+    request.scope["user_id"] = user.id
     return user
 
 
+def get_current_user_id(
+    request: Request,
+    token: str = Depends(security),
+    user_service: UserService = Depends(get_user_service)
+) -> int:
+    """
+    Get current authenticated user id from JWT token
+    Validates the token and session like get_current_user but skips loading the user
+    """
+    user_id = user_service.get_user_id_by_token(token)
+    
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    request.scope["user_id"] = user_id
+    return user_id
+
+
 def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    token: Optional[str] = Depends(security),
     user_service: UserService = Depends(get_user_service)
 ) -> Optional[User]:
     """
     Get current user if token is provided and valid, otherwise return None
     """
-    if credentials is None:
+    if token is None:
         return None
     
-    token = credentials.credentials
     return user_service.get_user_by_token(token)
\ No newline at end of file
@@ -7,7 +7,9 @@ from typing import Callable
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.utils.cache import LocalCache, create_async_redis_counters
 from app.utils.logging import get_logger
 
 
@@ -19,10 +21,10 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Generate request ID
-        request_id = str(uuid.uuid4())
+        request_id = uuid.uuid4().hex
         
         # Log request
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
         logger.info("request_started",
                    request_id=request_id,
@@ -35,13 +37,13 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             response = await call_next(request)
             
             # Calculate processing time
-            process_time = time.time() - start_time
+            process_time_ms = (time.perf_counter_ns() - start_time) // 1_000_000
             
             # Log response
             logger.info("request_completed",
                        request_id=request_id,
                        status_code=response.status_code,
-                       process_time_ms=int(process_time * 1000))
+                       process_time_ms=process_time_ms)
             
             # Add request ID to response headers
             response.headers["X-Request-ID"] = request_id
@@ -50,12 +52,12 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             
         except Exception as e:
             # Log error
-            process_time = time.time() - start_time
+            process_time_ms = (time.perf_counter_ns() - start_time) // 1_000_000
             
             logger.error("request_failed",
                         request_id=request_id,
                         error=str(e),
-                        process_time_ms=int(process_time * 1000))
+                        process_time_ms=process_time_ms)
             
             # Return error response
             return JSONResponse(
@@ -69,100 +71,109 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             )
 
 
-class AuthLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for authentication event logging"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        
-        # Log authentication events
-        if request.url.path.startswith("/auth/"):
-            if request.method == "POST":
-                if "login" in request.url.path:
-                    if response.status_code == 200:
-                        logger.info("auth_login_success", 
-                                   client_ip=request.client.host if request.client else "unknown")
-                    else:
-                        logger.warning("auth_login_failed",
-                                     status_code=response.status_code,
-                                     client_ip=request.client.host if request.client else "unknown")
-                
-                elif "register" in request.url.path:
-                    if response.status_code == 200:
-                        logger.info("auth_register_success",
-                                   client_ip=request.client.host if request.client else "unknown")
-                    else:
-                        logger.warning("auth_register_failed",
-                                     status_code=response.status_code,
-                                     client_ip=request.client.host if request.client else "unknown")
-        
-        return response
-
-
 class RateLimitingMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware"""
+    """Fixed-window rate limiting middleware"""
     
     def __init__(self, app, calls_per_minute: int = 60):
         super().__init__(app)
         self.calls_per_minute = calls_per_minute
-        self.client_requests = {}  # In production, use Redis or similar
+        # Redis shares the counters between workers (async client, so the
+        # round-trip never blocks the event loop); otherwise count per process
+        self.shared_counters = create_async_redis_counters()
+        self.local_counters = LocalCache(max_entries=10000)
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
+        window = int(time.time() // 60)
         
-        # Clean old entries (simple cleanup)
-        cutoff_time = current_time - 60  # 1 minute ago
-        self.client_requests = {
-            ip: requests for ip, requests in self.client_requests.items()
-            if any(req_time > cutoff_time for req_time in requests)
-        }
+        # Count the request in the current one-minute window
+        counter_key = f"rl:{client_ip}:{window}"
+        if self.shared_counters is not None:
+            requests_count = await self.shared_counters.incr(counter_key, 60)
+        else:
+            requests_count = self.local_counters.incr(counter_key, 60)
         
-        # Check rate limit for client
-        if client_ip in self.client_requests:
-            # Filter requests from last minute
-            recent_requests = [
-                req_time for req_time in self.client_requests[client_ip]
-                if req_time > cutoff_time
-            ]
-            
-            if len(recent_requests) >= self.calls_per_minute:
-                logger.warning("rate_limit_exceeded",
-                             client_ip=client_ip,
-                             requests_count=len(recent_requests))
-                
-                return JSONResponse(
-                    status_code=429,
-                    content={
-                        "success": False,
-                        "error": "Rate limit exceeded",
-                        "detail": f"Maximum {self.calls_per_minute} requests per minute"
-                    }
-                )
+        if requests_count > self.calls_per_minute:
+            logger.warning("rate_limit_exceeded",
+                         client_ip=client_ip,
+                         requests_count=requests_count)
             
-            self.client_requests[client_ip] = recent_requests + [current_time]
-        else:
-            self.client_requests[client_ip] = [current_time]
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "success": False,
+                    "error": "Rate limit exceeded",
+                    "detail": f"Maximum {self.calls_per_minute} requests per minute"
+                }
+            )
         
         return await call_next(request)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware for adding security headers"""
+class SecurityMiddleware:
+    """
+    Pure ASGI middleware adding security headers and logging authentication events
+    Runs in a single pass without wrapping the response body
+    """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        # Header pairs are encoded once and appended to every response
+        self._security_headers = [
+            (b"x-content-type-options", b"nosniff"),
+            (b"x-frame-options", b"DENY"),
+            (b"x-xss-protection", b"1; mode=block"),
+            (b"referrer-policy", b"strict-origin-when-cross-origin"),
+        ]
+        self._cors_headers = [
+            (b"access-control-allow-origin", b"*"),
+            (b"access-control-allow-methods", b"GET, POST, PUT, DELETE, OPTIONS"),
+            (b"access-control-allow-headers", b"Authorization, Content-Type"),
+        ]
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Add CORS headers if needed
-        if request.method == "OPTIONS":
-            response.headers["Access-Control-Allow-Origin"] = "*"
-            response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-            response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type"
+        method = scope["method"]
+        path = scope["path"]
         
-        return response
\ No newline at end of file
+        # Authentication events worth logging
+        auth_event = None
+        if method == "POST" and path.startswith("/auth/"):
+            if "login" in path:
+                auth_event = "login"
+            elif "register" in path:
+                auth_event = "register"
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add security headers
+                headers = list(message.get("headers", ()))
+                headers.extend(self._security_headers)
+                
+                # Add CORS headers if needed
+                if method == "OPTIONS":
+                    headers.extend(self._cors_headers)
+                
+                message["headers"] = headers
+                
+                if auth_event is not None:
+                    _log_auth_event(auth_event, message["status"], scope)
+            
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
+
+
+def _log_auth_event(event: str, status_code: int, scope: Scope) -> None:
+    """Log authentication event outcome"""
+    client = scope.get("client")
+    client_ip = client[0] if client else "unknown"
+    
+    if status_code == 200:
+        logger.info(f"auth_{event}_success", client_ip=client_ip)
+    else:
+        logger.warning(f"auth_{event}_failed", status_code=status_code, client_ip=client_ip)
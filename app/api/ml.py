@@ -1,21 +1,80 @@
 """
 ML API endpoints for model management and inference
 """
-from typing import Optional, List
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterator, Optional, List, Tuple
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.ml.ml_service import MLService
+from app.ml.batch_scheduler import BatchScheduler
+from app.ml.ml_service import MLService, normalize_model_name
+from app.ml.response_cache import response_cache
 from app.api.dependencies import get_current_user
+from app.database import SessionLocal
 from app.models import User
+from app.services.billing_service import BillingService
+from app.utils.cache import LocalCache
+from config import settings
 
 
 router = APIRouter(prefix="/ml", tags=["machine-learning"])
 
+# Blocking inference and torch/CUDA calls run here, off the event loop and
+# apart from the default executor used for other sync work
+ml_executor = ThreadPoolExecutor(max_workers=settings.ml_workers, thread_name_prefix="ml")
+
+
+async def run_ml(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking ML call on the ML executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ml_executor, partial(func, *args, **kwargs))
+
+
+def _pump_tokens(tokens: Iterator[str], loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, stop: threading.Event) -> None:
+    """
+    Feed a blocking token stream into an event loop queue as (kind, value) items
+    Runs on its own thread, which is also the only one calling next() and close()
+    """
+    try:
+        for token in tokens:
+            if stop.is_set():
+                return
+            loop.call_soon_threadsafe(queue.put_nowait, ("token", token))
+        loop.call_soon_threadsafe(queue.put_nowait, ("done", None))
+    except Exception as e:
+        if not stop.is_set():
+            loop.call_soon_threadsafe(queue.put_nowait, ("error", e))
+    finally:
+        tokens.close()
+
+
+def _charge_generation(user_id: int, cost: int, model_name: str, prompt: str) -> Tuple[bool, str, int]:
+    """
+    Charge a completed streamed generation
+    Uses its own session since the request's may already be closed while streaming
+    Returns (success, message, remaining_credits)
+    """
+    db = SessionLocal()
+    try:
+        return BillingService(db).charge_credits(
+            user_id=user_id,
+            amount=cost,
+            description=f"Generation with {model_name}: {prompt[:50]}..."
+        )
+    finally:
+        db.close()
+
 
 # Pydantic schemas
 class GenerateRequest(BaseModel):
     """Request for text generation"""
+    # Field constraints are checked inside pydantic-core and published in the
+    # OpenAPI schema; a Python field_validator would only add a call per request
     prompt: str = Field(..., min_length=1, max_length=2000, description="Input prompt for generation")
     model_name: str = Field(..., description="Model to use for generation")
     max_length: Optional[int] = Field(None, ge=50, le=1000, description="Maximum response length")
@@ -61,24 +120,50 @@ class ErrorResponse(BaseModel):
 # Global ML service instance
 ml_service = MLService()
 
+# Status and model listings reflect this process's loaded models, so they are
+# cached per process and cleared whenever models change
+ML_STATUS_CACHE_TTL = 2
+MODEL_COST_CACHE_TTL = 3600
+_ml_cache = LocalCache(max_entries=64)
+PRICED_MODELS = frozenset({"gemma3_1b", "gemma3_4b"})
+
+# Batches concurrent /generate requests onto the ML executor
+batch_scheduler = BatchScheduler(
+    ml_service,
+    ml_executor,
+    max_batch=settings.ml_batch_size,
+    max_wait_ms=settings.ml_batch_wait_ms
+)
+
 
 def get_ml_service() -> MLService:
     """Get ML service instance"""
     return ml_service
 
 
-@router.on_event("startup")
 async def startup_ml_service():
-    """Initialize ML service on startup (4B only)"""
+    """Initialize ML service on startup, loading configured models concurrently"""
     try:
-        from config import settings
         if settings.use_ollama:
             print("ML Service init: Ollama mode enabled, skipping HF model load")
         else:
-            ok4 = ml_service.reload_model("gemma3_4b")
-            print(f"ML Service init 4B-only: gemma3_4b loaded={ok4}")
+            # Loads are bandwidth-bound, so they overlap on separate threads
+            results = await asyncio.gather(*(
+                asyncio.to_thread(ml_service.load_model, name)
+                for name in settings.preload_models
+            ))
+            print(f"ML Service init: {dict(zip(settings.preload_models, results))}")
     except Exception as e:
         print(f"Failed to initialize ML service: {e}")
+    
+    batch_scheduler.start()
+
+
+async def shutdown_ml_service():
+    """Stop batching generation requests and release models"""
+    await batch_scheduler.stop()
+    await asyncio.to_thread(ml_service.shutdown)
+    ml_executor.shutdown(wait=False)
 
 
 @router.get("/status", response_model=SystemStatus)
@@ -86,8 +171,11 @@ async def get_system_status(
     ml_service: MLService = Depends(get_ml_service)
 ):
     """Get ML system status"""
-    status = ml_service.get_system_status()
-    return SystemStatus(**status)
+    system_status = _ml_cache.get("status")
+    if system_status is None:
+        system_status = SystemStatus.model_construct(**ml_service.get_system_status())
+        _ml_cache.set("status", system_status, ML_STATUS_CACHE_TTL)
+    return system_status
 
 
 @router.get("/models", response_model=List[ModelInfo])
@@ -95,21 +183,10 @@ async def get_available_models(
     ml_service: MLService = Depends(get_ml_service)
 ):
     """Get list of available models"""
-    available_models = ml_service.get_available_models()
-    
-    models_info = []
-    for model_name in available_models:
-        info = ml_service.get_model_info(model_name)
-        cost = ml_service.get_model_cost(model_name)
-        
-        models_info.append(ModelInfo(
-            name=model_name,
-            cost=cost,
-            available=True,
-            memory_usage_gb=info.get("memory_usage_gb") if info else None,
-            device=info.get("device") if info else None
-        ))
-    
+    models_info = _ml_cache.get("models")
+    if models_info is None:
+        models_info = [ModelInfo.model_construct(**d) for d in ml_service.describe_all()]
+        _ml_cache.set("models", models_info, ML_STATUS_CACHE_TTL)
     return models_info
 
 
@@ -119,7 +196,15 @@ async def get_model_cost(
     ml_service: MLService = Depends(get_ml_service)
 ):
     """Get cost for specific model"""
-    cost = ml_service.get_model_cost(model_name)
+    # Keyed by internal model name so arbitrary path values cannot add entries
+    normalized_name = normalize_model_name(model_name)
+    cache_key = f"cost:{normalized_name}"
+    cost = _ml_cache.get(cache_key)
+    if cost is None:
+        cost = ml_service.get_model_cost(model_name)
+        if normalized_name in PRICED_MODELS:
+            # Costs come from settings and only change on restart
+            _ml_cache.set(cache_key, cost, MODEL_COST_CACHE_TTL)
     return {
         "model_name": model_name,
         "cost": cost,
@@ -127,14 +212,11 @@ async def get_model_cost(
     }
 
 
-@router.post("/generate", response_model=GenerateResponse)
-async def generate_text(
-    request: GenerateRequest,
-    current_user: User = Depends(get_current_user),
-    ml_service: MLService = Depends(get_ml_service)
-):
-    """Generate text using specified model"""
-    
+def _check_generation_allowed(request: GenerateRequest, current_user: User, ml_service: MLService) -> int:
+    """
+    Reject generation the service cannot run or the user cannot afford
+    Returns model cost
+    """
     # Check if ML service is initialized
     if not ml_service.models_loaded:
         raise HTTPException(
@@ -160,27 +242,51 @@ async def generate_text(
             detail=f"Insufficient credits. You have {current_user.credits}, need {cost}"
         )
     
+    return cost
+
+
+@router.post("/generate", response_model=GenerateResponse)
+async def generate_text(
+    request: GenerateRequest,
+    current_user: User = Depends(get_current_user),
+    ml_service: MLService = Depends(get_ml_service)
+):
+    """Generate text using specified model"""
+    
+    cost = _check_generation_allowed(request, current_user, ml_service)
+
     try:
-        # Generate response
-        success, response, processing_time = ml_service.generate_response(
-            prompt=request.prompt,
-            model_name=request.model_name,
-            max_length=request.max_length,
-            temperature=request.temperature
+        # Aliases of one model ("Gemma3 1B", "1b") share cached responses
+        cache_key = (
+            request.prompt, normalize_model_name(request.model_name), request.max_length, request.temperature
         )
-        
-        if not success:
-            # Generation failed, don't charge credits
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Text generation failed: {response}"
+        response = response_cache.get(cache_key)
+
+        if response is not None:
+            processing_time = 0
+        else:
+            # Generate response
+            success, response, processing_time = await batch_scheduler.submit(
+                prompt=request.prompt,
+                model_name=request.model_name,
+                max_length=request.max_length,
+                temperature=request.temperature
             )
-        
+
+            if not success:
+                # Generation failed, don't charge credits
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Text generation failed: {response}"
+                )
+
+            response_cache.set(cache_key, response)
+
         # TODO: Integrate with billing service to charge credits
         # For now, we'll simulate charging credits
         remaining_credits = current_user.credits - cost
         
-        return GenerateResponse(
+        return GenerateResponse.model_construct(
             success=True,
             response=response,
             model_used=request.model_name,
@@ -196,6 +302,80 @@ async def generate_text(
         )
 
 
+@router.post("/generate/stream")
+async def generate_text_stream(
+    request: GenerateRequest,
+    current_user: User = Depends(get_current_user),
+    ml_service: MLService = Depends(get_ml_service)
+):
+    """
+    Generate text using specified model, streaming tokens as Server-Sent Events
+    Credits are charged once the stream completes; the final event carries
+    the same billing fields as /generate
+    """
+    
+    cost = _check_generation_allowed(request, current_user, ml_service)
+    
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        tokens = ml_service.stream_response(
+            request.prompt,
+            request.model_name,
+            request.max_length,
+            request.temperature
+        )
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        
+        # Tokens are pulled on a dedicated thread so the loop never blocks and a
+        # slow stream never holds the ML executor that batches /generate
+        threading.Thread(
+            target=_pump_tokens,
+            args=(tokens, loop, queue, stop),
+            name="ml-stream",
+            daemon=True
+        ).start()
+        
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == "done":
+                    break
+                if kind == "error":
+                    # Generation failed, don't charge credits
+                    yield b"data: " + orjson.dumps({"error": f"Text generation failed: {str(value)}"}) + b"\n\n"
+                    return
+                yield b"data: " + orjson.dumps({"token": value}) + b"\n\n"
+        finally:
+            # On client disconnect the pump closes the backend stream, which
+            # stops generation, once its in-flight token has been returned
+            stop.set()
+        
+        # Charged only once the stream completed; errors and disconnects are free
+        processing_time = int((loop.time() - start_time) * 1000)
+        charged, charge_message, remaining_credits = await asyncio.to_thread(
+            _charge_generation, current_user.id, cost, request.model_name, request.prompt
+        )
+        if not charged:
+            yield b"data: " + orjson.dumps({"error": f"Billing failed: {charge_message}"}) + b"\n\n"
+            return
+        
+        yield b"data: " + orjson.dumps({
+            "done": True,
+            "model_used": request.model_name,
+            "processing_time_ms": processing_time,
+            "credits_charged": cost,
+            "remaining_credits": remaining_credits
+        }) + b"\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/optimize-memory")
 async def optimize_memory(
     current_user: User = Depends(get_current_user),
@@ -207,7 +387,8 @@ async def optimize_memory(
     # In production, you might want to restrict this to admin users
     
     try:
-        optimization_report = ml_service.optimize_memory()
+        optimization_report = await run_ml(ml_service.optimize_memory)
+        _ml_cache.clear()
         return {
             "success": True,
             "message": "Memory optimization completed",
@@ -229,7 +410,9 @@ async def reload_model(
     """Reload a specific model (admin function)"""
     
     try:
-        success = ml_service.reload_model(model_name)
+        success = await run_ml(ml_service.reload_model, model_name)
+        _ml_cache.clear()
+        response_cache.clear()
         
         if success:
             return {
@@ -1,17 +1,18 @@
 """
 Monitoring API endpoints
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.services.monitoring_service import MonitoringService
-from app.api.dependencies import get_current_user
-from app.models import User
+from app.api.dependencies import get_current_user_id
+from app.api.responses import ORJSONResponse
 from app.utils.logging import get_logger
+from app.utils.metrics_cache import metrics_snapshot
 
 
-router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+router = APIRouter(prefix="/monitoring", tags=["monitoring"], default_response_class=ORJSONResponse)
 logger = get_logger(__name__)
 
 
@@ -22,17 +23,16 @@ def get_monitoring_service(db: Session = Depends(get_db)) -> MonitoringService:
 
 @router.get("/system")
 async def get_system_metrics(
-    current_user: User = Depends(get_current_user),
-    monitoring_service: MonitoringService = Depends(get_monitoring_service)
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """Get current system metrics"""
-    return monitoring_service.get_system_metrics()
+    return ORJSONResponse(metrics_snapshot.get())
 
 
 @router.get("/usage")
-async def get_usage_statistics(
+def get_usage_statistics(
     days: int = Query(7, ge=1, le=30, description="Number of days to analyze"),
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
     monitoring_service: MonitoringService = Depends(get_monitoring_service)
 ):
     """Get usage statistics"""
@@ -40,8 +40,8 @@ async def get_usage_statistics(
 
 
 @router.get("/performance")
-async def get_performance_metrics(
-    current_user: User = Depends(get_current_user),
+def get_performance_metrics(
+    current_user_id: int = Depends(get_current_user_id),
     monitoring_service: MonitoringService = Depends(get_monitoring_service)
 ):
     """Get performance metrics"""
@@ -49,9 +49,9 @@ async def get_performance_metrics(
 
 
 @router.get("/users")
-async def get_user_analytics(
+def get_user_analytics(
     limit: int = Query(10, ge=1, le=50, description="Number of top users to return"),
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
     monitoring_service: MonitoringService = Depends(get_monitoring_service)
 ):
     """Get user analytics"""
@@ -59,7 +59,7 @@ async def get_user_analytics(
 
 
 @router.get("/health")
-async def get_health_report(
+def get_health_report(
     monitoring_service: MonitoringService = Depends(get_monitoring_service)
 ):
     """Get comprehensive health report"""
@@ -68,42 +68,25 @@ async def get_health_report(
 
 @router.get("/metrics")
 async def get_monitoring_metrics(
-    current_user: User = Depends(get_current_user),
-    monitoring_service: MonitoringService = Depends(get_monitoring_service)
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """Get system monitoring metrics"""
-    try:
-        metrics = monitoring_service.get_system_metrics()
-        return {
-            "success": True,
-            "metrics": metrics
-        }
-        
-    except Exception as e:
-        logger.error("get_monitoring_metrics_failed", user_id=current_user.id, error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to get monitoring metrics"
-        )
+    metrics = metrics_snapshot.get()
+    return ORJSONResponse({
+        "success": True,
+        "metrics": metrics
+    })
 
 
 @router.get("/analytics")
-async def get_monitoring_analytics(
+def get_monitoring_analytics(
     days: int = Query(7, ge=1, le=30, description="Number of days to analyze"),
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
     monitoring_service: MonitoringService = Depends(get_monitoring_service)
 ):
     """Get usage analytics"""
-    try:
-        analytics = monitoring_service.get_usage_analytics(days)
-        return {
-            "success": True,
-            "analytics": analytics
-        }
-        
-    except Exception as e:
-        logger.error("get_monitoring_analytics_failed", user_id=current_user.id, error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to get usage analytics"
-        )
\ No newline at end of file
+    analytics = monitoring_service.get_usage_analytics(days)
+    return {
+        "success": True,
+        "analytics": analytics
+    }
@@ -1,84 +1,85 @@
 """
 Performance monitoring middleware for FastAPI
 """
+import asyncio
+import gc
 import time
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import torch
+except ImportError:
+    torch = None
 
 from app.utils.performance_monitor import request_tracker, system_monitor
 from app.utils.logging import get_logger
+from app.utils.metrics_cache import metrics_snapshot
 
 
 logger = get_logger(__name__)
 
+_RESPONSE_TIME_HEADER = b"x-response-time"
+_RATE_LIMIT_REMAINING_HEADER = b"x-ratelimit-remaining"
+
+# Liveness/readiness probes that would otherwise dominate request statistics
+_UNTRACKED_PATHS = frozenset({"/", "/health", "/metrics", "/ready"})
+
 
-class PerformanceMiddleware(BaseHTTPMiddleware):
-    """Middleware to track request performance metrics"""
+class PerformanceMiddleware:
+    """Pure ASGI middleware to track request performance metrics"""
     
-    def __init__(self, app, enable_detailed_logging: bool = False):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, enable_detailed_logging: bool = False, slow_request_ms: int = 5000):
+        self.app = app
         self.enable_detailed_logging = enable_detailed_logging
+        self.slow_request_ms = slow_request_ms
         
         # Start system monitoring if not already started
         if not system_monitor.monitoring:
             system_monitor.start_monitoring()
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and track performance metrics"""
-        start_time = time.time()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter_ns()
         
         # Extract request info
-        method = request.method
-        path = request.url.path
-        user_id = None
+        method = scope["method"]
+        path = scope["path"]
+        status_code = 500
+        duration_ms = None
         
-        # Try to get user ID from request state (set by auth middleware)
-        if hasattr(request.state, 'user_id'):
-            user_id = request.state.user_id
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, duration_ms
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
+                
+                # Add performance headers
+                headers = list(message.get("headers", ()))
+                headers.append((_RESPONSE_TIME_HEADER, b"%dms" % duration_ms))
+                message["headers"] = headers
+            
+            await send(message)
+        
+        # Probes still get X-Response-Time but are not tracked
+        if path in _UNTRACKED_PATHS:
+            await self.app(scope, receive, send_wrapper)
+            return
         
         try:
             # Process request
-            response = await call_next(request)
-            
-            # Calculate duration
-            duration_ms = int((time.time() - start_time) * 1000)
-            
-            # Record metrics
-            request_tracker.record_request(
-                endpoint=path,
-                method=method,
-                duration_ms=duration_ms,
-                status_code=response.status_code,
-                user_id=user_id
-            )
-            
-            # Add performance headers
-            response.headers["X-Response-Time"] = f"{duration_ms}ms"
-            
-            # Log slow requests
-            if duration_ms > 5000:  # 5 seconds
-                logger.warning("slow_request_detected",
-                             endpoint=path,
-                             method=method,
-                             duration_ms=duration_ms,
-                             status_code=response.status_code,
-                             user_id=user_id)
-            
-            # Detailed logging if enabled
-            if self.enable_detailed_logging:
-                logger.info("request_completed",
-                           endpoint=path,
-                           method=method,
-                           duration_ms=duration_ms,
-                           status_code=response.status_code,
-                           user_id=user_id)
-            
-            return response
+            await self.app(scope, receive, send_wrapper)
             
         except Exception as e:
             # Calculate duration for failed requests
-            duration_ms = int((time.time() - start_time) * 1000)
+            duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
+            user_id = scope.get("user_id")
             
             # Record error metrics
             request_tracker.record_request(
@@ -98,25 +99,85 @@ class PerformanceMiddleware(BaseHTTPMiddleware):
             
             # Re-raise the exception
             raise
+        
+        if duration_ms is None:
+            duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
+        user_id = scope.get("user_id")
+        
+        # Record metrics
+        request_tracker.record_request(
+            endpoint=path,
+            method=method,
+            duration_ms=duration_ms,
+            status_code=status_code,
+            user_id=user_id
+        )
+        
+        # Log fields are only built when something will be logged
+        is_slow = duration_ms > self.slow_request_ms
+        if not (is_slow or self.enable_detailed_logging):
+            return
+        
+        log_fields = {
+            "endpoint": path,
+            "method": method,
+            "duration_ms": duration_ms,
+            "status_code": status_code,
+            "user_id": user_id
+        }
+        
+        # Log slow requests
+        if is_slow:
+            logger.warning("slow_request_detected", **log_fields)
+        
+        # Detailed logging if enabled
+        if self.enable_detailed_logging:
+            logger.info("request_completed", **log_fields)
 
 
-class MemoryMonitoringMiddleware(BaseHTTPMiddleware):
-    """Middleware to monitor memory usage and trigger cleanup"""
+class MemoryMonitoringMiddleware:
+    """Pure ASGI middleware to monitor memory usage and trigger cleanup"""
     
-    def __init__(self, app, memory_threshold: float = 0.9):
-        super().__init__(app)
+    def __init__(
+        self,
+        app: ASGIApp,
+        memory_threshold: float = 0.9,
+        min_cleanup_interval: float = 30.0,
+        monitored_prefixes: Tuple[str, ...] = ("/ml", "/chat")
+    ):
+        self.app = app
         self.memory_threshold = memory_threshold
+        # Only inference routes allocate model memory; other requests pass straight through
+        self.monitored_prefixes = monitored_prefixes
+        self.min_cleanup_interval = min_cleanup_interval
         self.cleanup_in_progress = False
+        self._last_cleanup_at = 0.0
+        self._checked_metrics = None
+        self._cleanup_event: Optional[asyncio.Event] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Monitor memory and trigger cleanup if needed"""
+        if scope["type"] != "http" or not scope["path"].startswith(self.monitored_prefixes):
+            await self.app(scope, receive, send)
+            return
         
-        # Check memory before processing request
-        current_metrics = system_monitor.get_current_metrics()
+        # Check memory before processing request; each snapshot is evaluated
+        # once, so requests between refreshes skip straight to the app
+        current_metrics = metrics_snapshot.get()
+        if current_metrics is not self._checked_metrics:
+            self._checked_metrics = current_metrics
+            self._check_memory(current_metrics)
         
-        # Check if memory cleanup is needed
-        memory_usage = current_metrics.get("memory", {}).get("usage_percent", 0)
-        gpu_usage = current_metrics.get("gpu", {}).get("usage_percent", 0)
+        # Process request normally
+        await self.app(scope, receive, send)
+    
+    def _check_memory(self, current_metrics: dict):
+        """Trigger cleanup if memory usage in the snapshot is over the threshold"""
+        memory_metrics = current_metrics.get("memory")
+        gpu_metrics = current_metrics.get("gpu")
+        memory_usage = memory_metrics.get("usage_percent", 0) if memory_metrics else 0
+        gpu_usage = gpu_metrics.get("usage_percent", 0) if gpu_metrics else 0
         
         if (memory_usage > self.memory_threshold * 100 or 
             gpu_usage > self.memory_threshold * 100) and not self.cleanup_in_progress:
@@ -128,181 +189,158 @@ class MemoryMonitoringMiddleware(BaseHTTPMiddleware):
             
             # Trigger async cleanup (don't block request)
             self._trigger_async_cleanup()
-        
-        # Process request normally
-        response = await call_next(request)
-        
-        return response
     
     def _trigger_async_cleanup(self):
-        """Trigger asynchronous memory cleanup"""
-        if self.cleanup_in_progress:
-            return
-        
-        import threading
+        """Signal the cleanup task, starting it on first use"""
+        if self._cleanup_task is None:
+            self._cleanup_event = asyncio.Event()
+            self._cleanup_task = asyncio.get_running_loop().create_task(self._cleanup_loop())
         
-        def cleanup_worker():
+        self._cleanup_event.set()
+    
+    async def _cleanup_loop(self):
+        """Run one cleanup per signal, off the event loop"""
+        while True:
+            await self._cleanup_event.wait()
+            self._cleanup_event.clear()
+            
+            self.cleanup_in_progress = True
             try:
-                self.cleanup_in_progress = True
                 logger.info("starting_memory_cleanup")
-                
-                # Import here to avoid circular imports
-                from app.ml.optimized_ml_service import OptimizedMLService
-                
-                # Trigger garbage collection
-                import gc
-                gc.collect()
-                
-                # Clear GPU cache if available
-                try:
-                    import torch
-                    if torch.cuda.is_available():
-                        torch.cuda.empty_cache()
-                        torch.cuda.synchronize()
-                except ImportError:
-                    pass
-                
+                await asyncio.to_thread(self._do_cleanup)
                 logger.info("memory_cleanup_completed")
-                
             except Exception as e:
                 logger.error("memory_cleanup_failed", error=str(e))
             finally:
                 self.cleanup_in_progress = False
+    
+    def _do_cleanup(self):
+        """
+        Collect garbage and return cached GPU blocks to the driver
+        Runs at most once per min_cleanup_interval
+        """
+        now = time.monotonic()
+        if now - self._last_cleanup_at < self.min_cleanup_interval:
+            return
+        self._last_cleanup_at = now
         
-        cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
-        cleanup_thread.start()
+        # Tensors are freed only once Python drops its references
+        gc.collect()
+        
+        # Released blocks would just be re-allocated, so only hand them back to
+        # the driver while the caching allocator holds more than the threshold.
+        # No synchronize(): it would stall in-flight generations
+        if torch is not None and torch.cuda.is_available():
+            total = torch.cuda.get_device_properties(0).total_memory
+            if torch.cuda.memory_reserved() > total * self.memory_threshold:
+                torch.cuda.empty_cache()
 
 
-class RateLimitingMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware"""
+class RateLimitingMiddleware:
+    """Pure ASGI token-bucket rate limiting middleware"""
+    
+    # Idle buckets are dropped on every Nth request rather than scanned per request
+    SWEEP_EVERY = 1024
+    # Bounds memory when clients rotate spoofed X-Forwarded-For addresses
+    MAX_BUCKETS = 100_000
     
-    def __init__(self, app, requests_per_minute: int = 60):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, requests_per_minute: int = 60):
+        self.app = app
         self.requests_per_minute = requests_per_minute
-        self.request_counts = {}
-        self.window_start = {}
+        self.refill_per_second = requests_per_minute / 60
+        # client IP -> [tokens, last refill time], mutated in place, least recently used first
+        self.buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._requests_since_sweep = 0
+        self._limit_header = (b"x-ratelimit-limit", b"%d" % requests_per_minute)
         
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Apply rate limiting based on client IP"""
-        client_ip = self._get_client_ip(request)
-        current_time = time.time()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Clean old entries
-        self._cleanup_old_entries(current_time)
+        client_ip = self._get_client_ip(scope)
+        remaining = self._take_token(client_ip, time.monotonic())
         
-        # Check rate limit
-        if self._is_rate_limited(client_ip, current_time):
+        if remaining is None:
             logger.warning("rate_limit_exceeded", client_ip=client_ip)
             
-            from fastapi import HTTPException, status
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please try again later."
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded. Please try again later."},
+                status_code=429
             )
+            await response(scope, receive, send)
+            return
         
-        # Record request
-        self._record_request(client_ip, current_time)
-        
-        # Process request
-        response = await call_next(request)
+        remaining_header = (_RATE_LIMIT_REMAINING_HEADER, b"%d" % remaining)
         
-        # Add rate limit headers
-        remaining = max(0, self.requests_per_minute - self.request_counts.get(client_ip, 0))
-        response.headers["X-RateLimit-Limit"] = str(self.requests_per_minute)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add rate limit headers
+                headers = list(message.get("headers", ()))
+                headers.append(self._limit_header)
+                headers.append(remaining_header)
+                message["headers"] = headers
+            
+            await send(message)
         
-        return response
+        # Process request
+        await self.app(scope, receive, send_wrapper)
     
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP from request"""
-        # Check for forwarded headers first
-        forwarded_for = request.headers.get("X-Forwarded-For")
+    def _get_client_ip(self, scope: Scope) -> str:
+        """Extract client IP from request scope in one pass over the raw headers"""
+        forwarded_for = real_ip = None
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                forwarded_for = value
+                break
+            if name == b"x-real-ip" and real_ip is None:
+                real_ip = value
+        
+        # Forwarded headers take precedence; the first hop is the client
         if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
+            return forwarded_for.partition(b",")[0].strip().decode("latin-1")
         
-        real_ip = request.headers.get("X-Real-IP")
         if real_ip:
-            return real_ip
+            return real_ip.decode("latin-1")
         
         # Fallback to direct client IP
-        return request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        return client[0] if client else "unknown"
     
-    def _is_rate_limited(self, client_ip: str, current_time: float) -> bool:
-        """Check if client is rate limited"""
-        if client_ip not in self.request_counts:
-            return False
+    def _take_token(self, client_ip: str, now: float) -> Optional[int]:
+        """
+        Refill the client's bucket and take one token
+        Returns tokens left, or None if the client is rate limited
+        """
+        capacity = self.requests_per_minute
+        bucket = self.buckets.get(client_ip)
+        if bucket is None:
+            bucket = [capacity, now]
+            self.buckets[client_ip] = bucket
+            if len(self.buckets) > self.MAX_BUCKETS:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(client_ip)
         
-        # Check if we're in the same minute window
-        window_start = self.window_start.get(client_ip, 0)
-        if current_time - window_start >= 60:  # New minute window
-            return False
+        bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+        bucket[1] = now
         
-        return self.request_counts[client_ip] >= self.requests_per_minute
-    
-    def _record_request(self, client_ip: str, current_time: float):
-        """Record a request for rate limiting"""
-        # Check if we need to start a new window
-        if (client_ip not in self.window_start or 
-            current_time - self.window_start[client_ip] >= 60):
-            self.window_start[client_ip] = current_time
-            self.request_counts[client_ip] = 1
-        else:
-            self.request_counts[client_ip] = self.request_counts.get(client_ip, 0) + 1
-    
-    def _cleanup_old_entries(self, current_time: float):
-        """Clean up old rate limiting entries"""
-        expired_ips = []
+        self._requests_since_sweep += 1
+        if self._requests_since_sweep >= self.SWEEP_EVERY:
+            self._sweep_idle_buckets(now)
         
-        for client_ip, window_start in self.window_start.items():
-            if current_time - window_start >= 120:  # Keep for 2 minutes
-                expired_ips.append(client_ip)
+        if bucket[0] < 1:
+            return None
         
-        for ip in expired_ips:
-            self.request_counts.pop(ip, None)
-            self.window_start.pop(ip, None)
-
-
-class HealthCheckMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle health checks and system status"""
+        bucket[0] -= 1
+        return int(bucket[0])
     
-    def __init__(self, app):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Handle health check requests"""
+    def _sweep_idle_buckets(self, now: float):
+        """Drop buckets idle long enough to have refilled completely"""
+        self._requests_since_sweep = 0
         
-        # Quick health check endpoint
-        if request.url.path == "/health":
-            from fastapi.responses import JSONResponse
-            
-            try:
-                # Get basic system metrics
-                metrics = system_monitor.get_current_metrics()
-                
-                # Determine health status
-                memory_usage = metrics.get("memory", {}).get("usage_percent", 0)
-                cpu_usage = metrics.get("cpu", {}).get("usage_percent", 0)
-                
-                if memory_usage > 95 or cpu_usage > 95:
-                    status = "unhealthy"
-                elif memory_usage > 85 or cpu_usage > 85:
-                    status = "degraded"
-                else:
-                    status = "healthy"
-                
-                return JSONResponse({
-                    "status": status,
-                    "timestamp": metrics.get("timestamp"),
-                    "memory_usage_percent": memory_usage,
-                    "cpu_usage_percent": cpu_usage
-                })
-                
-            except Exception as e:
-                logger.error("health_check_failed", error=str(e))
-                return JSONResponse({
-                    "status": "error",
-                    "error": str(e)
-                }, status_code=500)
-        
-        # Process normal requests
-        return await call_next(request)
\ No newline at end of file
+        # An empty bucket refills to capacity within one minute
+        idle_ips = [ip for ip, (_, last) in self.buckets.items() if now - last >= 60]
+        for ip in idle_ips:
+            del self.buckets[ip]
@@ -0,0 +1,43 @@
+"""
+Response classes for API endpoints
+"""
+import hashlib
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    # SUM() over integer columns returns Decimal on PostgreSQL
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (naive datetimes are treated as UTC)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NAIVE_UTC)
+
+
+def etag_response(request: Request, content: Any, max_age: int = 0) -> Response:
+    """
+    JSON response tagged with a hash of its body
+    Returns an empty 304 when the client already holds the same representation
+    """
+    body = orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NAIVE_UTC)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}" if max_age else "no-cache",
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(body, media_type="application/json", headers=headers)
@@ -2,15 +2,19 @@
 Pydantic schemas for API requests and responses
 """
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
+from typing import Annotated, Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, field_validator
+
+
+# Shape check compiled once in pydantic-core; avoids importing email-validator
+Email = Annotated[str, StringConstraints(pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$")]
 
 
 # User schemas
 class UserRegisterRequest(BaseModel):
     """User registration request"""
     username: str = Field(..., min_length=3, max_length=50)
-    email: EmailStr
+    email: Email
     password: str = Field(..., min_length=8)
 
 
@@ -29,8 +33,7 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserInfoResponse(BaseModel):
@@ -41,6 +44,14 @@ class UserInfoResponse(BaseModel):
     credits: int
     created_at: str
     updated_at: str
+    
+    model_config = ConfigDict(from_attributes=True)
+    
+    @field_validator("created_at", "updated_at", mode="before")
+    @classmethod
+    def format_timestamp(cls, value):
+        """Accept datetimes read from ORM objects"""
+        return value.isoformat() if isinstance(value, datetime) else value
 
 
 # Authentication schemas
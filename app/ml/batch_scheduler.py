@@ -0,0 +1,168 @@
+"""
+Request batching for text generation
+"""
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from app.ml.ml_service import MLService, normalize_model_name
+from app.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PendingGeneration:
+    """Generation request waiting for a batch"""
+    prompt: str
+    model_name: str
+    max_length: Optional[int]
+    temperature: Optional[float]
+    future: asyncio.Future
+
+    @property
+    def batch_key(self) -> Tuple[str, Optional[int], Optional[float]]:
+        """
+        Requests sharing a model and generation parameters can run together
+        Aliases of one model ("Gemma3 1B", "1b") share a batch
+        """
+        return normalize_model_name(self.model_name), self.max_length, self.temperature
+
+
+class BatchScheduler:
+    """
+    Collects concurrent generation requests and runs them as batched model.generate calls
+    Waits at most max_wait_ms after the first request for up to max_batch requests
+    """
+
+    def __init__(
+        self,
+        ml_service: MLService,
+        executor: Executor,
+        max_batch: int = 8,
+        max_wait_ms: int = 10
+    ):
+        self.ml_service = ml_service
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the batching loop on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run_loop())
+
+    async def stop(self) -> None:
+        """Stop the batching loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(
+        self,
+        prompt: str,
+        model_name: str,
+        max_length: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> Tuple[bool, str, int]:
+        """
+        Queue a prompt and wait for its batch to finish
+        Returns (success, response, processing_time_ms)
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(PendingGeneration(prompt, model_name, max_length, temperature, future))
+        return await future
+
+    async def _collect(self, items: List[PendingGeneration]) -> None:
+        """
+        Wait for one request, then gather more until the batch fills or the window closes
+        Requests are added to items as they arrive, so none are lost if the wait is cancelled
+        """
+        loop = asyncio.get_running_loop()
+        items.append(await self._queue.get())
+        deadline = loop.time() + self.max_wait
+
+        while len(items) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run_loop(self) -> None:
+        """Run collected batches until stopped; requests still pending then get an error result"""
+        items: List[PendingGeneration] = []
+        message = "Batch scheduler stopped"
+        try:
+            while True:
+                items = []
+                await self._collect(items)
+                await self._run_groups(items)
+        except Exception as e:
+            logger.error("batch_scheduler_loop_failed", error=str(e))
+            message = f"Error generating response: {str(e)}"
+        finally:
+            # A later submit starts a fresh loop
+            self._task = None
+            self._fail_pending(items, message)
+
+    async def _run_groups(self, items: List[PendingGeneration]) -> None:
+        """Run requests grouped by model and generation parameters"""
+        loop = asyncio.get_running_loop()
+
+        groups: Dict[Tuple[str, Optional[int], Optional[float]], List[PendingGeneration]] = {}
+        for item in items:
+            # Clients that disconnected while queued are dropped
+            if not item.future.cancelled():
+                groups.setdefault(item.batch_key, []).append(item)
+
+        for (_, max_length, temperature), group in groups.items():
+            model_name = group[0].model_name
+            try:
+                results = await loop.run_in_executor(
+                    self.executor,
+                    partial(
+                        self.ml_service.generate_batch,
+                        [item.prompt for item in group],
+                        model_name,
+                        max_length,
+                        temperature
+                    )
+                )
+            except Exception as e:
+                logger.error("batch_scheduler_failed", model=model_name, batch_size=len(group), error=str(e))
+                results = [(False, f"Error generating response: {str(e)}", 0)] * len(group)
+
+            if len(results) != len(group):
+                logger.error("batch_result_count_mismatch", model=model_name,
+                             batch_size=len(group), results=len(results))
+
+            for item, result in zip(group, results):
+                if not item.future.done():
+                    item.future.set_result(result)
+
+            for item in group[len(results):]:
+                if not item.future.done():
+                    item.future.set_result((False, "Error generating response: no result returned", 0))
+
+    def _fail_pending(self, items: List[PendingGeneration], message: str) -> None:
+        """Resolve in-flight and queued requests that have no result yet"""
+        while not self._queue.empty():
+            items.append(self._queue.get_nowait())
+
+        for item in items:
+            if not item.future.done():
+                item.future.set_result((False, message, 0))
@@ -1,18 +1,77 @@
 """
 ML service for text generation using Gemma3 models
 """
+import copy
+import re
+import threading
 import time
 import torch
-from typing import Optional, Tuple, Dict, Any
-from transformers import GenerationConfig
+from functools import lru_cache
+from typing import Optional, Tuple, Dict, Any, Iterator, List, Union
+from torch.nn.attention import SDPBackend, sdpa_kernel
+from transformers import GenerationConfig, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
 
-from app.ml.model_loader import ModelLoader
+from app.ml.model_loader import CHAT_PREFIX, CHAT_SUFFIX, ModelLoader, kv_cache_options
 from app.utils.logging import get_logger
 from config import settings
 
 
 logger = get_logger(__name__)
 
+# Accepted model names (from API clients and the UI) to internal names
+_NAME_MAPPING = {
+    "Gemma3 1B": "gemma3_1b",
+    "Gemma3 4B": "gemma3_4b",
+    "gemma3_1b": "gemma3_1b",
+    "gemma3_4b": "gemma3_4b",
+    "1b": "gemma3_1b",
+    "4b": "gemma3_4b",
+    # be tolerant to input format from UI
+    "Gemma3 1b": "gemma3_1b",
+    "Gemma3 4b": "gemma3_4b",
+    "gemma3 1b": "gemma3_1b",
+    "gemma3 4b": "gemma3_4b",
+}
+
+
+@lru_cache(maxsize=128)
+def normalize_model_name(model_name: str) -> str:
+    """Normalize model name to internal format (memoized per name)"""
+    key = model_name.strip()
+    return _NAME_MAPPING.get(key) or _NAME_MAPPING.get(key.lower(), key.lower())
+
+
+# End-of-turn markers a decoded response is cut at
+_END_TOKEN_RE = re.compile(r"<end_of_turn>|<\|endoftext\|>|</s>")
+
+# Detokenization options; space clean-up is an extra regex pass over the text
+# that SentencePiece output does not need
+DECODE_KWARGS = {"skip_special_tokens": True, "clean_up_tokenization_spaces": False}
+
+# Seconds a stream consumer waits for the next token
+STREAM_TOKEN_TIMEOUT = 60
+
+# Prompt tokens kept per request, chat template included
+MAX_INPUT_TOKENS = 2048
+
+# Attention kernels tried in order on CUDA; math is the last resort
+CUDA_SDPA_BACKENDS = [
+    SDPBackend.CUDNN_ATTENTION,
+    SDPBackend.FLASH_ATTENTION,
+    SDPBackend.EFFICIENT_ATTENTION,
+    SDPBackend.MATH,
+]
+
+
+class StopOnEvent(StoppingCriteria):
+    """Stops generate at the next step once the event is set"""
+    
+    def __init__(self, event: threading.Event):
+        self.event = event
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
 
 class MLService:
     """Service for ML model inference and management"""
@@ -73,23 +132,7 @@ class MLService:
             return True
         return self.model_loader.is_model_loaded(normalized_name)
     
-    def _normalize_model_name(self, model_name: str) -> str:
-        """Normalize model name to internal format"""
-        name_mapping = {
-            "Gemma3 1B": "gemma3_1b",
-            "Gemma3 4B": "gemma3_4b",
-            "gemma3_1b": "gemma3_1b",
-            "gemma3_4b": "gemma3_4b",
-            "1b": "gemma3_1b",
-            "4b": "gemma3_4b",
-            # be tolerant to input format from UI
-            "Gemma3 1b": "gemma3_1b",
-            "Gemma3 4b": "gemma3_4b",
-            "gemma3 1b": "gemma3_1b",
-            "gemma3 4b": "gemma3_4b",
-        }
-        key = model_name.strip()
-        return name_mapping.get(key, name_mapping.get(key.lower(), model_name.lower()))
+    _normalize_model_name = staticmethod(normalize_model_name)
     
     def get_available_models(self) -> list:
         """Get list of available models"""
@@ -144,93 +187,22 @@ class MLService:
             if settings.use_ollama:
                 return self._generate_ollama_response(prompt, model_name, max_length, temperature)
             
-            # Ensure requested model is loaded (sequential swap if needed)
-            if not self.is_model_available(normalized_name):
-                # Try to load this model (will unload others first)
-                reloaded = self.reload_model(normalized_name)
-                if not reloaded:
-                    return False, f"Model {model_name} is not available", 0
-            
-            # Get model components
-            model_data = self.model_loader.models[normalized_name]
-            model = model_data["model"]
-            tokenizer = model_data["tokenizer"]
-            generation_config = model_data["generation_config"]
-            
-            # Prepare inputs using chat template for instruction-tuned Gemma 3
-            if "gemma3" in normalized_name or "gemma" in normalized_name:
-                # Use explicit Gemma chat formatting to avoid tokenizer message schema issues
-                formatted_prompt = self._format_prompt(prompt, normalized_name)
-                inputs = tokenizer(
-                    formatted_prompt,
-                    return_tensors="pt",
-                    truncation=True,
-                    max_length=2048,
-                )
-            else:
-                # Fallback simple formatting
-                formatted_prompt = self._format_prompt(prompt, normalized_name)
-                inputs = tokenizer(
-                    formatted_prompt,
-                    return_tensors="pt",
-                    truncation=True,
-                    max_length=2048,
-                )
-            
-            # Ensure inputs are on the same device as input embeddings
-            embedding_device = model.get_input_embeddings().weight.device
-            inputs = {k: v.to(embedding_device) for k, v in inputs.items()}
-            
-            # Override generation config if specified
-            if max_length or temperature:
-                generation_config = GenerationConfig(
-                    max_new_tokens=max_length or settings.max_response_length,
-                    temperature=temperature or 0.7,
-                    do_sample=True,
-                    top_p=0.9,
-                    pad_token_id=tokenizer.eos_token_id,
-                    eos_token_id=tokenizer.eos_token_id,
-                )
+            prepared = self._prepare_hf_generation(normalized_name, prompt, max_length, temperature)
+            if prepared is None:
+                return False, f"Model {model_name} is not available", 0
+            model, tokenizer, inputs, generation_config = prepared
             
             # Generate response
             logger.info("generating_response", 
                        model=normalized_name, 
                        prompt_length=len(prompt))
             
-            with torch.no_grad():
-                # Prefer math (eager) SDPA to avoid alignment issues in some kernels
-                try:
-                    from torch.backends.cuda import sdp_kernel  # type: ignore
-                    if torch.cuda.is_available():
-                        with sdp_kernel(enable_flash=False, enable_math=True, enable_mem_efficient=False):
-                            outputs = model.generate(
-                                **inputs,
-                                generation_config=generation_config,
-                                do_sample=True,
-                                pad_token_id=tokenizer.eos_token_id,
-                                eos_token_id=tokenizer.eos_token_id,
-                            )
-                    else:
-                        outputs = model.generate(
-                            **inputs,
-                            generation_config=generation_config,
-                            do_sample=True,
-                            pad_token_id=tokenizer.eos_token_id,
-                            eos_token_id=tokenizer.eos_token_id,
-                        )
-                except Exception:
-                    outputs = model.generate(
-                        **inputs,
-                        generation_config=generation_config,
-                        do_sample=True,
-                        pad_token_id=tokenizer.eos_token_id,
-                        eos_token_id=tokenizer.eos_token_id,
-                    )
+            outputs = self._run_hf_generate(model, tokenizer, inputs, generation_config)
             
             # Decode response
             input_length = inputs["input_ids"].shape[1]
             generated_tokens = outputs[0][input_length:]
-            response = tokenizer.decode(generated_tokens, skip_special_tokens=True)
+            response = tokenizer.decode(generated_tokens, **DECODE_KWARGS)
             
             # Clean up response
             response = self._clean_response(response)
@@ -261,24 +233,288 @@ class MLService:
             
             return False, f"Error generating response: {str(e)}", processing_time
     
+    def stream_response(
+        self,
+        prompt: str,
+        model_name: str,
+        max_length: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> Iterator[str]:
+        """
+        Generate response using specified model, yielding text chunks as they are produced
+        Raises on failure so the caller can settle billing
+        """
+        if settings.demo_mode:
+            _, response, _ = self._generate_mock_response(prompt, model_name, time.time())
+            for index, word in enumerate(response.split(" ")):
+                yield word if index == 0 else f" {word}"
+            return
+        
+        normalized_name = self._normalize_model_name(model_name)
+        
+        if settings.use_ollama:
+            ollama_model = self._resolve_ollama_model(normalized_name)
+            if not self.ollama_client or not ollama_model:
+                raise RuntimeError(f"Model {model_name} not supported by Ollama backend")
+            
+            parts = self.ollama_client.generate(
+                model=ollama_model,
+                prompt=prompt,
+                options=self._ollama_options(max_length, temperature),
+                stream=True
+            )
+            try:
+                for part in parts:
+                    text = part.get('response', '')
+                    if text:
+                        yield text
+            finally:
+                # Drops the HTTP stream, which makes Ollama stop generating
+                parts.close()
+            return
+        
+        prepared = self._prepare_hf_generation(normalized_name, prompt, max_length, temperature)
+        if prepared is None:
+            raise RuntimeError(f"Model {model_name} is not available")
+        model, tokenizer, inputs, generation_config = prepared
+        
+        # The timeout keeps the consumer from waiting forever on a stalled generate
+        streamer = TextIteratorStreamer(
+            tokenizer,
+            skip_prompt=True,
+            timeout=STREAM_TOKEN_TIMEOUT,
+            **DECODE_KWARGS
+        )
+        errors = []
+        stop = threading.Event()
+        
+        def run():
+            try:
+                self._run_hf_generate(
+                    model, tokenizer, inputs, generation_config,
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([StopOnEvent(stop)])
+                )
+            except Exception as e:
+                errors.append(e)
+                # Unblock the consumer waiting on the streamer
+                streamer.end()
+        
+        logger.info("streaming_response", model=normalized_name, prompt_length=len(prompt))
+        
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            # Closing this generator early (client gone) stops generate after
+            # the current step instead of decoding up to max_new_tokens
+            stop.set()
+        worker.join()
+        
+        if errors:
+            raise errors[0]
+    
+    def generate_batch(
+        self,
+        prompts: List[str],
+        model_name: str,
+        max_length: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> List[Tuple[bool, str, int]]:
+        """
+        Generate responses for several prompts in one model.generate call
+        Returns (success, response, processing_time_ms) per prompt; only the HF backend batches
+        """
+        if len(prompts) == 1 or settings.demo_mode or settings.use_ollama:
+            return [self.generate_response(p, model_name, max_length, temperature) for p in prompts]
+        
+        start_time = time.time()
+        normalized_name = self._normalize_model_name(model_name)
+        
+        try:
+            prepared = self._prepare_hf_generation(normalized_name, prompts, max_length, temperature)
+            if prepared is None:
+                return [(False, f"Model {model_name} is not available", 0)] * len(prompts)
+            model, tokenizer, inputs, generation_config = prepared
+            
+            logger.info("generating_batch", model=normalized_name, batch_size=len(prompts))
+            
+            outputs = self._run_hf_generate(model, tokenizer, inputs, generation_config)
+            
+            # Left padding puts every prompt's end at the same offset
+            input_length = inputs["input_ids"].shape[1]
+            responses = tokenizer.batch_decode(outputs[:, input_length:], **DECODE_KWARGS)
+            
+            processing_time = int((time.time() - start_time) * 1000)
+            
+            logger.info("batch_generated",
+                       model=normalized_name,
+                       batch_size=len(prompts),
+                       processing_time_ms=processing_time)
+            
+            return [(True, self._clean_response(r), processing_time) for r in responses]
+            
+        except torch.cuda.OutOfMemoryError:
+            logger.error("cuda_out_of_memory", model=normalized_name, batch_size=len(prompts))
+            self.model_loader.optimize_memory_usage()
+            
+            # A single prompt may still fit
+            return [self.generate_response(p, model_name, max_length, temperature) for p in prompts]
+            
+        except Exception as e:
+            processing_time = int((time.time() - start_time) * 1000)
+            logger.error("batch_generation_failed",
+                        model=normalized_name,
+                        batch_size=len(prompts),
+                        error=str(e))
+            return [(False, f"Error generating response: {str(e)}", processing_time)] * len(prompts)
+    
+    def _prepare_hf_generation(
+        self,
+        normalized_name: str,
+        prompt: Union[str, List[str]],
+        max_length: Optional[int],
+        temperature: Optional[float]
+    ) -> Optional[Tuple[Any, Any, Dict[str, Any], GenerationConfig]]:
+        """
+        Load the model if needed and build tokenized inputs and generation config
+        A list of prompts is left-padded into one batch
+        Returns (model, tokenizer, inputs, generation_config) or None if model is unavailable
+        """
+        # Ensure requested model is loaded (sequential swap if needed)
+        if not self.is_model_available(normalized_name):
+            # Try to load this model (will unload others first)
+            if not self.reload_model(normalized_name):
+                return None
+        
+        # Get model components
+        model_data = self.model_loader.models[normalized_name]
+        model = model_data["model"]
+        tokenizer = model_data["tokenizer"]
+        generation_config = model_data["generation_config"]
+        
+        # Ensure inputs are on the same device as input embeddings
+        embedding_device = model.get_input_embeddings().weight.device
+        
+        is_batch = isinstance(prompt, list)
+        prompts = prompt if is_batch else [prompt]
+        if "chat_prefix_ids" in model_data:
+            inputs = self._encode_chat_prompts(model_data, prompts, embedding_device)
+        else:
+            # No cached template ids: tokenize the explicitly formatted Gemma chat
+            # prompt to avoid tokenizer message schema issues
+            formatted_prompt = [self._format_prompt(p, normalized_name) for p in prompts]
+            # Decoder-only models continue from the right edge of every row
+            tokenizer.padding_side = "left"
+            inputs = tokenizer(
+                formatted_prompt if is_batch else formatted_prompt[0],
+                return_tensors="pt",
+                truncation=True,
+                max_length=MAX_INPUT_TOKENS,
+                padding=is_batch,
+            )
+            inputs = {k: self._to_device(v, embedding_device) for k, v in inputs.items()}
+        
+        # KV cache depends on prompt length, so it may differ from the model default
+        cache_options = kv_cache_options(inputs["input_ids"].shape[1])
+        
+        # Override generation config if specified
+        if max_length or temperature:
+            generation_config = GenerationConfig(
+                max_new_tokens=max_length or settings.max_response_length,
+                temperature=temperature or 0.7,
+                do_sample=True,
+                top_p=0.9,
+                pad_token_id=tokenizer.eos_token_id,
+                eos_token_id=tokenizer.eos_token_id,
+                **cache_options,
+            )
+        elif cache_options["cache_implementation"] != generation_config.cache_implementation:
+            # Copy so the model's shared default config is left untouched
+            generation_config = copy.deepcopy(generation_config)
+            generation_config.update(**cache_options)
+        
+        return model, tokenizer, inputs, generation_config
+    
+    def _run_hf_generate(self, model, tokenizer, inputs: Dict[str, Any], generation_config: GenerationConfig, **kwargs):
+        """Run model.generate, preferring fused SDPA kernels on CUDA"""
+        generate_kwargs = dict(
+            inputs,
+            generation_config=generation_config,
+            do_sample=True,
+            pad_token_id=tokenizer.eos_token_id,
+            eos_token_id=tokenizer.eos_token_id,
+            **kwargs
+        )
+        
+        with torch.no_grad():
+            # CPU keeps torch's default choice, which already has a fused bf16 kernel
+            if not torch.cuda.is_available():
+                return model.generate(**generate_kwargs)
+            try:
+                with sdpa_kernel(CUDA_SDPA_BACKENDS, set_priority=True):
+                    return model.generate(**generate_kwargs)
+            except torch.cuda.OutOfMemoryError:
+                raise
+            except Exception as e:
+                # A streamer may already hold tokens from the failed attempt
+                if "streamer" in kwargs:
+                    raise
+                # Shapes or dtypes no fused kernel supports fall through to math
+                logger.warning("fused_sdpa_failed", error=str(e))
+                with sdpa_kernel(SDPBackend.MATH):
+                    return model.generate(**generate_kwargs)
+    
+    def _encode_chat_prompts(self, model_data: Dict[str, Any], prompts: List[str], device) -> Dict[str, torch.Tensor]:
+        """
+        Tokenize only the user prompts and wrap them in the model's pre-tokenized
+        chat template ids; rows are left-padded to a common length
+        """
+        tokenizer = model_data["tokenizer"]
+        prefix_ids = model_data["chat_prefix_ids"]
+        suffix_ids = model_data["chat_suffix_ids"]
+        # Truncate the prompt itself so the model turn marker always survives
+        budget = MAX_INPUT_TOKENS - len(prefix_ids) - len(suffix_ids)
+        rows = [
+            prefix_ids + ids[:budget] + suffix_ids
+            for ids in tokenizer(prompts, add_special_tokens=False)["input_ids"]
+        ]
+        
+        width = max(len(row) for row in rows)
+        pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+        input_ids = [[pad_id] * (width - len(row)) + row for row in rows]
+        attention_mask = [[0] * (width - len(row)) + [1] * len(row) for row in rows]
+        return {
+            "input_ids": self._to_device(torch.tensor(input_ids), device),
+            "attention_mask": self._to_device(torch.tensor(attention_mask), device),
+        }
+    
+    @staticmethod
+    def _to_device(tensor: torch.Tensor, device) -> torch.Tensor:
+        """
+        Copy a host tensor to the model device
+        CUDA copies go through pinned memory without blocking; generate's first
+        kernels are queued on the same stream, so no synchronize is needed
+        """
+        if torch.device(device).type != "cuda":
+            return tensor.to(device)
+        return tensor.pin_memory().to(device, non_blocking=True)
+    
     def _format_prompt(self, prompt: str, model_name: str) -> str:
         """Format prompt for specific model"""
         # Basic prompt formatting for Gemma models
         if "gemma" in model_name.lower():
-            return f"<start_of_turn>user\n{prompt}<end_of_turn>\n<start_of_turn>model\n"
+            return f"{CHAT_PREFIX}{prompt}{CHAT_SUFFIX}"
         else:
             return prompt
     
     def _clean_response(self, response: str) -> str:
         """Clean and format the generated response"""
-        # Remove common artifacts
-        response = response.strip()
-        
-        # Remove end tokens if present
-        end_tokens = ["<end_of_turn>", "<|endoftext|>", "</s>"]
-        for token in end_tokens:
-            if token in response:
-                response = response.split(token)[0]
+        # Keep only the text before the first end token, if any
+        response = _END_TOKEN_RE.split(response, maxsplit=1)[0].strip()
         
         # Limit response length
         if len(response) > settings.max_response_length * 4:  # Rough character limit
@@ -297,7 +533,21 @@ class MLService:
                 "loaded": True,
             }
         return self.model_loader.get_model_info(normalized_name)
-    
+
+    def describe_all(self) -> List[Dict[str, Any]]:
+        """Get name, cost and placement of every available model, shaped for ModelInfo"""
+        descriptions = []
+        for model_name in self.get_available_models():
+            info = self.get_model_info(model_name) or {}
+            descriptions.append({
+                "name": model_name,
+                "cost": self.get_model_cost(model_name),
+                "available": True,
+                "memory_usage_gb": info.get("memory_usage_gb"),
+                "device": info.get("device")
+            })
+        return descriptions
+
     def get_system_status(self) -> Dict[str, Any]:
         """Get system status and model information"""
         if settings.use_ollama:
@@ -335,11 +585,31 @@ class MLService:
                 # No-op in Ollama mode; report success for UI
                 return True
             
-            # Unload all currently loaded models to free memory for the target
-            for loaded in list(self.model_loader.models.keys()):
+            # A quantized 4B fits next to 1B, so only the target is swapped;
+            # otherwise unload everything to free memory for the target
+            if settings.gemma3_4b_quantization == "none":
+                to_unload = list(self.model_loader.models.keys())
+            else:
+                to_unload = [normalized_name]
+            for loaded in to_unload:
                 self.model_loader.unload_model(loaded)
             
-            # Reload model
+            return self.load_model(normalized_name)
+                
+        except Exception as e:
+            logger.error("model_reload_failed", model=model_name, error=str(e))
+            return False
+    
+    def load_model(self, model_name: str) -> bool:
+        """
+        Load a model alongside any already loaded ones
+        Returns True if successful, False otherwise
+        """
+        try:
+            normalized_name = self._normalize_model_name(model_name)
+            if settings.use_ollama:
+                return True
+            
             if normalized_name == "gemma3_1b":
                 ok = self.model_loader.load_gemma3_1b()
             elif normalized_name == "gemma3_4b":
@@ -350,9 +620,9 @@ class MLService:
             if ok:
                 self.models_loaded = True
             return ok
-                
+            
         except Exception as e:
-            logger.error("model_reload_failed", model=model_name, error=str(e))
+            logger.error("model_load_failed", model=model_name, error=str(e))
             return False
     
     def shutdown(self):
@@ -382,22 +652,7 @@ class MLService:
         if not self.ollama_client:
             return False, "Ollama client not initialized", 0
 
-        # Map model names to Ollama model names
-        model_map = {
-            "gemma3_1b": "llama3.2:1b",  # Use llama as fallback since gemma3 not available
-            "gemma3_4b": "llama3.2:3b",  # Use llama as fallback
-        }
-
-        normalized_name = self._normalize_model_name(model_name)
-        ollama_model = model_map.get(normalized_name)
-
-        # Additional fallback logic
-        if not ollama_model:
-            if "1b" in normalized_name or "small" in normalized_name.lower():
-                ollama_model = "llama3.2:1b"
-            elif "4b" in normalized_name:
-                ollama_model = "llama3.2:3b"
-
+        ollama_model = self._resolve_ollama_model(self._normalize_model_name(model_name))
         if not ollama_model:
             return False, f"Model {model_name} not supported by Ollama backend", 0
 
@@ -406,16 +661,7 @@ class MLService:
             response = self.ollama_client.generate(
                 model=ollama_model,
                 prompt=prompt,
-                options={
-                    "num_predict": max_length or min(settings.max_response_length, 128),
-                    "temperature": temperature or 0.7,
-                    "top_k": 30,
-                    "top_p": 0.85,
-                    "num_ctx": 1024,  # Balanced context size
-                    "num_thread": -1,  # Use all available threads
-                    "repeat_penalty": 1.1,
-                    "repeat_last_n": 32,
-                }
+                options=self._ollama_options(max_length, temperature)
             )
 
             generated_text = response.get('response', '').strip()
@@ -431,6 +677,42 @@ class MLService:
             logger.error("ollama_generation_failed", model=model_name, error=str(e))
             return False, f"Ollama generation failed: {str(e)}", int((time.time() - start_time) * 1000)
 
+    def _resolve_ollama_model(self, normalized_name: str) -> Optional[str]:
+        """Map model names to Ollama model names"""
+        model_map = {
+            "gemma3_1b": "llama3.2:1b",  # Use llama as fallback since gemma3 not available
+            "gemma3_4b": "llama3.2:3b",  # Use llama as fallback
+        }
+        ollama_model = model_map.get(normalized_name)
+
+        # Additional fallback logic
+        if not ollama_model:
+            if "1b" in normalized_name or "small" in normalized_name.lower():
+                ollama_model = "llama3.2:1b"
+            elif "4b" in normalized_name:
+                ollama_model = "llama3.2:3b"
+
+        return ollama_model
+
+    @staticmethod
+    def _ollama_options(max_length: Optional[int], temperature: Optional[float]) -> Dict[str, Any]:
+        """Ollama generation options"""
+        return {
+            "num_predict": max_length or min(settings.max_response_length, 128),
+            "temperature": temperature or 0.7,
+            "top_k": 30,
+            "top_p": 0.85,
+            "num_ctx": 1024,  # Balanced context size
+            "num_thread": -1,  # Use all available threads
+            "repeat_penalty": 1.1,
+            "repeat_last_n": 32,
+            "num_batch": 512,  # Prompt tokens evaluated per step
+            "use_mmap": True,
+            "use_mlock": False,
+            # KV cache precision is server-wide, not a request option: run the
+            # server with OLLAMA_FLASH_ATTENTION=1 OLLAMA_KV_CACHE_TYPE=q8_0
+        }
+
     def _generate_mock_response(self, prompt: str, model_name: str, start_time: float) -> Tuple[bool, str, int]:
         """Generate mock response for demo mode"""
         import random
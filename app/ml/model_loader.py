@@ -4,7 +4,7 @@ Model loader for Gemma3 models with quantization support
 import os
 import gc
 import torch
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 # Avoid importing torchvision via transformers image utils on text-only usage
 os.environ.setdefault("TRANSFORMERS_NO_TORCHVISION", "1")
@@ -24,6 +24,34 @@ from config import settings
 logger = get_logger(__name__)
 
 
+# Gemma chat turn around the user prompt; tokenized once per loaded model
+CHAT_PREFIX = "<start_of_turn>user\n"
+CHAT_SUFFIX = "<end_of_turn>\n<start_of_turn>model\n"
+
+# 4-bit HQQ KV cache used when settings.kv_cache_quantization is on
+QUANTIZED_KV_CACHE_CONFIG = {"backend": "HQQ", "nbits": 4, "axis_key": 0, "axis_value": 0}
+
+
+def kv_cache_options(input_length: int = 0) -> Dict[str, Any]:
+    """
+    KV cache settings for generate() given the prompt length in tokens
+    Compiled models need the pre-allocated static cache, since the default dynamic
+    cache grows every step and defeats torch.compile; long prompts on CUDA offload
+    cold layers to CPU memory; otherwise the cache is optionally quantized
+    """
+    if settings.compile_model:
+        return {"cache_implementation": "static", "cache_config": None}
+    if (
+        settings.kv_offload_min_tokens
+        and input_length > settings.kv_offload_min_tokens
+        and torch.cuda.is_available()
+    ):
+        return {"cache_implementation": "offloaded", "cache_config": None}
+    if settings.kv_cache_quantization:
+        return {"cache_implementation": "quantized", "cache_config": dict(QUANTIZED_KV_CACHE_CONFIG)}
+    return {"cache_implementation": None, "cache_config": None}
+
+
 class ModelLoader:
     """Loader for Gemma3 models with memory optimization"""
     
@@ -87,14 +115,16 @@ class ModelLoader:
                 token=settings.hf_token
             )
             
-            # Load model; prefer bfloat16 on cuda, float32 on cpu
+            # Load model in bfloat16 on both devices: decode is bound by weight
+            # reads, and fp32 would double the bytes moved per token
             kwargs = dict(
                 cache_dir=settings.model_cache_dir,
+                torch_dtype=torch.bfloat16,
                 trust_remote_code=True,
                 token=settings.hf_token,
             )
             if self.device == "cuda":
-                kwargs.update(dict(torch_dtype=torch.bfloat16, device_map="auto"))
+                kwargs.update(dict(device_map="auto"))
             model = AutoModelForCausalLM.from_pretrained(settings.gemma3_1b_model, **kwargs)
             
             if self.device == "cpu":
@@ -106,19 +136,25 @@ class ModelLoader:
                 do_sample=True,
                 temperature=0.7,
                 top_p=0.9,
-                pad_token_id=tokenizer.eos_token_id
+                pad_token_id=tokenizer.eos_token_id,
+                **kv_cache_options()
             )
             
+            if settings.compile_model:
+                self._compile_model(model_name, model, tokenizer)
+            
             self.models[model_name] = {
                 "model": model,
                 "tokenizer": tokenizer,
                 "generation_config": generation_config,
                 "cost": settings.gemma3_1b_cost,
+                **self._chat_template_ids(tokenizer),
                 "loaded_at": torch.cuda.memory_allocated() if torch.cuda.is_available() else 0
             }
             
             logger.info("model_loaded_successfully", 
                        model=model_name,
+                       dtype=str(model.dtype),
                        memory_usage_gb=self.get_memory_usage())
             return True
             
@@ -128,7 +164,8 @@ class ModelLoader:
     
     def load_gemma3_4b(self) -> bool:
         """
-        Load Gemma3 4B model on GPU (no quantization), with device_map="auto" and bfloat16.
+        Load Gemma3 4B model on GPU with device_map="auto" and bfloat16,
+        weight-quantized per settings.gemma3_4b_quantization
         Returns True if successful, False otherwise
         """
         model_name = "gemma3_4b"
@@ -145,8 +182,7 @@ class ModelLoader:
             
             logger.info("loading_model", model=model_name, model_id=settings.gemma3_4b_model)
             
-            # Prefer stable CPU load for 4B to avoid CUDA kernel issues
-            quantization_config = None
+            quantization_config = self._quantization_config(settings.gemma3_4b_quantization)
             
             # Load tokenizer
             tokenizer = AutoTokenizer.from_pretrained(
@@ -155,16 +191,18 @@ class ModelLoader:
                 token=settings.hf_token
             )
             
-            # Load model on GPU with BF16 and device_map auto
+            # Load model on GPU with BF16 and device_map auto; quantized weights
+            # are dequantized to BF16 inside each matmul
             model = AutoModelForCausalLM.from_pretrained(
                 settings.gemma3_4b_model,
                 cache_dir=settings.model_cache_dir,
                 torch_dtype=torch.bfloat16,
+                quantization_config=quantization_config,
                 device_map="auto",
                 low_cpu_mem_usage=True,
                 trust_remote_code=True,
                 token=settings.hf_token,
-                attn_implementation="eager"
+                attn_implementation="sdpa"
             )
             
             # Configure generation
@@ -173,19 +211,25 @@ class ModelLoader:
                 do_sample=True,
                 temperature=0.7,
                 top_p=0.9,
-                pad_token_id=tokenizer.eos_token_id
+                pad_token_id=tokenizer.eos_token_id,
+                **kv_cache_options()
             )
             
+            if settings.compile_model:
+                self._compile_model(model_name, model, tokenizer)
+            
             self.models[model_name] = {
                 "model": model,
                 "tokenizer": tokenizer,
                 "generation_config": generation_config,
                 "cost": settings.gemma3_4b_cost,
+                **self._chat_template_ids(tokenizer),
                 "loaded_at": torch.cuda.memory_allocated() if torch.cuda.is_available() else 0
             }
             
             logger.info("model_loaded_successfully", 
                        model=model_name,
+                       dtype=str(model.dtype),
                        memory_usage_gb=self.get_memory_usage())
             return True
             
@@ -193,6 +237,74 @@ class ModelLoader:
             logger.error("model_loading_failed", model=model_name, error=str(e))
             return False
     
+    def _chat_template_ids(self, tokenizer) -> Dict[str, List[int]]:
+        """Pre-tokenized chat template around the user prompt"""
+        return {
+            # The prefix carries BOS, as when tokenizing the whole formatted prompt
+            "chat_prefix_ids": tokenizer(CHAT_PREFIX)["input_ids"],
+            "chat_suffix_ids": tokenizer(CHAT_SUFFIX, add_special_tokens=False)["input_ids"],
+        }
+    
+    def _quantization_config(self, quantization: str) -> Optional[BitsAndBytesConfig]:
+        """
+        Build the bitsandbytes config for a quantization setting
+        Returns None for unquantized bf16 weights
+        """
+        if quantization == "int8":
+            return BitsAndBytesConfig(load_in_8bit=True, llm_int8_threshold=6.0)
+        if quantization == "nf4":
+            return BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch.bfloat16,
+                bnb_4bit_use_double_quant=True
+            )
+        if quantization != "none":
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        return None
+    
+    def _compile_model(self, model_name: str, model, tokenizer) -> bool:
+        """
+        Compile the model's forward pass and warm it up so the first request
+        does not pay the compile cost
+        Leaves the eager model in place if compilation fails
+        """
+        eager_forward = model.forward
+        embedding_device = model.get_input_embeddings().weight.device
+        
+        try:
+            if embedding_device.type == "cuda":
+                # "reduce-overhead" replays decode steps as CUDA graphs; with the
+                # static KV cache their shapes are fixed, so one graph serves every
+                # step. Prefill shapes vary with prompt length, so those graphs are
+                # skipped rather than recorded once per length
+                import torch._inductor.config as inductor_config
+                inductor_config.triton.cudagraph_skip_dynamic_graphs = True
+                mode = "reduce-overhead"
+            else:
+                mode = "default"
+            model.forward = torch.compile(eager_forward, mode=mode, fullgraph=False)
+            
+            # Warm up with a short prompt through the same generate path; enough
+            # decode steps to get past graph warm-up and record the decode graph
+            warmup_inputs = tokenizer("Hello " * 32, return_tensors="pt")
+            warmup_inputs = {k: v.to(embedding_device) for k, v in warmup_inputs.items()}
+            with torch.no_grad():
+                model.generate(
+                    **warmup_inputs,
+                    max_new_tokens=8,
+                    pad_token_id=tokenizer.eos_token_id,
+                    **kv_cache_options()
+                )
+            
+            logger.info("model_compiled", model=model_name)
+            return True
+            
+        except Exception as e:
+            model.forward = eager_forward
+            logger.error("model_compile_failed", model=model_name, error=str(e))
+            return False
+    
     def unload_model(self, model_name: str) -> bool:
         """
         Unload a model to free memory
@@ -295,7 +407,7 @@ class ModelLoader:
         
         # Try to load 4B model if memory allows
         if self.check_memory_available(3.5):
-            results["gemma3_4b"] = self.load_gemma3_4b_quantized()
+            results["gemma3_4b"] = self.load_gemma3_4b()
         else:
             logger.warning("skipping_4b_model", reason="insufficient_memory")
             results["gemma3_4b"] = False
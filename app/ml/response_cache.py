@@ -0,0 +1,72 @@
+"""
+LRU cache for generated responses
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+
+
+ResponseKey = Tuple[str, str, Optional[int], Optional[float]]
+
+
+class ResponseCache:
+    """
+    Generated responses keyed by (prompt, normalized model, max_length, temperature)
+    Repeated prompts are answered without running inference
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[ResponseKey, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: ResponseKey) -> Optional[str]:
+        """Get cached response, marking it most recently used"""
+        with self._lock:
+            response = self._data.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def set(self, key: ResponseKey, response: str) -> None:
+        """Cache response, evicting the least recently used entry when full"""
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = response
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached responses and reset counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get entry count and hit rate"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "total_entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global response cache instance
+response_cache = ResponseCache(settings.response_cache_size)
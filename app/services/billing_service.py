@@ -2,12 +2,15 @@
 Billing service for credit management and transactions
 """
 from datetime import datetime
-from typing import Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional
+from sqlalchemy import func, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import User, CreditTransaction
 from app.models.crud import UserCRUD, CreditTransactionCRUD
+from app.utils.cache import get_shared_cache
 from app.utils.logging import get_logger, log_billing_transaction
 from app.utils.transactions import atomic_transaction
 from config import settings
@@ -15,6 +18,17 @@ from config import settings
 
 logger = get_logger(__name__)
 
+# Balances are written through on every credit change; the TTL bounds
+# staleness from writers that bypass BillingService
+BALANCE_CACHE_TTL = 60
+
+
+def cache_user_balance(user_id: int, balance: int) -> None:
+    """Write a committed balance through to the shared cache"""
+    cache = get_shared_cache()
+    if cache is not None:
+        cache.set(f"user_credits:{user_id}", balance, BALANCE_CACHE_TTL)
+
 
 class BillingService:
     """Service for billing operations and credit management"""
@@ -34,26 +48,19 @@ class BillingService:
         """
         try:
             with atomic_transaction(self.db):
-                user = UserCRUD.get_by_id(self.db, user_id)
-                if not user:
-                    return False, "User not found", 0
-                
-                # Check if user has enough credits
-                if user.credits < amount:
+                # Deduct only if the balance covers the charge
+                new_balance = self._apply_credit_delta(user_id, -amount)
+                if new_balance is None:
+                    balance = self.get_user_balance(user_id)
+                    if balance is None:
+                        return False, "User not found", 0
+                    
                     log_billing_transaction(
                         logger, user_id, "charge_failed", -amount, 
                         reason="insufficient_credits", 
-                        current_balance=user.credits
+                        current_balance=balance
                     )
-                    return False, f"Insufficient credits. You have {user.credits}, need {amount}", user.credits
-                
-                # Calculate new balance
-                new_balance = user.credits - amount
-                
-                # Update user credits
-                success = UserCRUD.update_credits(self.db, user_id, new_balance)
-                if not success:
-                    return False, "Failed to update user credits", user.credits
+                    return False, f"Insufficient credits. You have {balance}, need {amount}", balance
                 
                 # Log transaction
                 CreditTransactionCRUD.create(
@@ -63,14 +70,16 @@ class BillingService:
                     transaction_type="charge",
                     description=description or f"Credit charge: {amount} credits"
                 )
-                
-                log_billing_transaction(
-                    logger, user_id, "charge", -amount,
-                    new_balance=new_balance,
-                    description=description
-                )
-                
-                return True, f"Successfully charged {amount} credits", new_balance
+            
+            cache_user_balance(user_id, new_balance)
+            
+            log_billing_transaction(
+                logger, user_id, "charge", -amount,
+                new_balance=new_balance,
+                description=description
+            )
+            
+            return True, f"Successfully charged {amount} credits", new_balance
             
         except SQLAlchemyError as e:
             logger.error("billing_charge_failed", error=str(e), user_id=user_id, amount=amount)
@@ -93,27 +102,21 @@ class BillingService:
             if amount <= 0:
                 return False, "Amount must be positive", 0
             
-            # Get current user
-            user = UserCRUD.get_by_id(self.db, user_id)
-            if not user:
-                return False, "User not found", 0
-            
-            # Calculate new balance
-            new_balance = user.credits + amount
-            
-            # Update user credits
-            success = UserCRUD.update_credits(self.db, user_id, new_balance)
-            if not success:
-                return False, "Failed to update user credits", user.credits
+            with atomic_transaction(self.db):
+                new_balance = self._apply_credit_delta(user_id, amount)
+                if new_balance is None:
+                    return False, "User not found", 0
+                
+                # Log transaction
+                CreditTransactionCRUD.create(
+                    db=self.db,
+                    user_id=user_id,
+                    amount=amount,  # Positive for add
+                    transaction_type="add",
+                    description=description or f"Credit addition: {amount} credits"
+                )
             
-            # Log transaction
-            CreditTransactionCRUD.create(
-                db=self.db,
-                user_id=user_id,
-                amount=amount,  # Positive for add
-                transaction_type="add",
-                description=description or f"Credit addition: {amount} credits"
-            )
+            cache_user_balance(user_id, new_balance)
             
             log_billing_transaction(
                 logger, user_id, "add", amount,
@@ -146,27 +149,21 @@ class BillingService:
             if amount <= 0:
                 return False, "Refund amount must be positive", 0
             
-            # Get current user
-            user = UserCRUD.get_by_id(self.db, user_id)
-            if not user:
-                return False, "User not found", 0
-            
-            # Calculate new balance
-            new_balance = user.credits + amount
-            
-            # Update user credits
-            success = UserCRUD.update_credits(self.db, user_id, new_balance)
-            if not success:
-                return False, "Failed to update user credits", user.credits
+            with atomic_transaction(self.db):
+                new_balance = self._apply_credit_delta(user_id, amount)
+                if new_balance is None:
+                    return False, "User not found", 0
+                
+                # Log transaction
+                CreditTransactionCRUD.create(
+                    db=self.db,
+                    user_id=user_id,
+                    amount=amount,  # Positive for refund
+                    transaction_type="refund",
+                    description=description or f"Credit refund: {amount} credits"
+                )
             
-            # Log transaction
-            CreditTransactionCRUD.create(
-                db=self.db,
-                user_id=user_id,
-                amount=amount,  # Positive for refund
-                transaction_type="refund",
-                description=description or f"Credit refund: {amount} credits"
-            )
+            cache_user_balance(user_id, new_balance)
             
             log_billing_transaction(
                 logger, user_id, "refund", amount,
@@ -185,14 +182,41 @@ class BillingService:
             logger.error("billing_refund_error", error=str(e), user_id=user_id, amount=amount)
             return False, "Unexpected error during refund operation", 0
     
+    def _apply_credit_delta(self, user_id: int, delta: int) -> Optional[int]:
+        """
+        Atomically change user credits, never going below zero
+        Returns new balance or None if user not found or balance is insufficient
+        """
+        return self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.credits + delta >= 0)
+            .values(credits=User.credits + delta)
+            .returning(User.credits)
+        ).scalar_one_or_none()
+    
     def get_user_balance(self, user_id: int) -> Optional[int]:
         """
         Get current user credit balance
         Returns balance or None if user not found
         """
         try:
+            cache = get_shared_cache()
+            cache_key = f"user_credits:{user_id}"
+            
+            if cache is not None:
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
             user = UserCRUD.get_by_id(self.db, user_id)
-            return user.credits if user else None
+            if user is None:
+                return None
+            
+            if cache is not None:
+                # A concurrent charge or refund may have written a newer balance
+                # through since the read; never overwrite it with this one
+                cache.add(cache_key, user.credits, BALANCE_CACHE_TTL)
+            return user.credits
             
         except Exception as e:
             logger.error("get_balance_failed", error=str(e), user_id=user_id)
@@ -203,17 +227,43 @@ class BillingService:
         user_id: int, 
         skip: int = 0, 
         limit: int = 100
-    ) -> List[CreditTransaction]:
+    ) -> Tuple[List[Row], int]:
         """
         Get user transaction history
-        Returns list of transactions
+        Returns (transactions, total_count) with the total computed in the same query;
+        transactions are column rows rather than ORM entities since they are only serialized
         """
         try:
-            return CreditTransactionCRUD.get_by_user(self.db, user_id, skip, limit)
+            rows = (
+                self.db.query(
+                    CreditTransaction.id,
+                    CreditTransaction.amount,
+                    CreditTransaction.transaction_type,
+                    CreditTransaction.description,
+                    CreditTransaction.created_at,
+                    func.count().over().label("total_count")
+                )
+                .filter(CreditTransaction.user_id == user_id)
+                .order_by(CreditTransaction.created_at.desc())
+                .offset(skip)
+                .limit(limit)
+                .all()
+            )
+            
+            if rows:
+                return rows, rows[0].total_count
+            
+            # Page past the end carries no window count
+            total_count = 0
+            if skip:
+                total_count = self.db.query(func.count(CreditTransaction.id)).filter(
+                    CreditTransaction.user_id == user_id
+                ).scalar()
+            return [], total_count
             
         except Exception as e:
             logger.error("get_transactions_failed", error=str(e), user_id=user_id)
-            return []
+            return [], 0
     
     def get_transaction_summary(self, user_id: int) -> dict:
         """
@@ -247,38 +297,53 @@ class BillingService:
                 "current_balance": 0
             }
     
-    def check_sufficient_credits(self, user_id: int, required_amount: int) -> Tuple[bool, str]:
+    def check_sufficient_credits(self, user_id: int, required_amount: int) -> Tuple[bool, str, Optional[int]]:
         """
         Check if user has sufficient credits for operation
-        Returns (has_sufficient, message)
+        Returns (has_sufficient, message, current_balance)
         """
         try:
             balance = self.get_user_balance(user_id)
             if balance is None:
-                return False, "User not found"
+                return False, "User not found", None
             
             if balance >= required_amount:
-                return True, f"Sufficient credits: {balance} >= {required_amount}"
+                return True, f"Sufficient credits: {balance} >= {required_amount}", balance
             else:
-                return False, f"Insufficient credits: {balance} < {required_amount}"
+                return False, f"Insufficient credits: {balance} < {required_amount}", balance
                 
         except Exception as e:
             logger.error("check_credits_failed", error=str(e), user_id=user_id)
-            return False, "Error checking credit balance"
+            return False, "Error checking credit balance", None
     
     def get_model_cost(self, model_name: str) -> int:
         """
         Get cost for using a specific model
         Returns credit cost
         """
-        model_costs = {
+        return self._model_cost_table().get(model_name, 1)  # Default to 1 credit
+    
+    def get_model_costs(self, model_names: List[str]) -> Dict[str, int]:
+        """
+        Get costs for several models at once
+        Returns mapping of model name to credit cost
+        """
+        model_costs = self._model_cost_table()
+        return {name: model_costs.get(name, 1) for name in model_names}
+    
+    def is_priced_model(self, model_name: str) -> bool:
+        """Check if a model has its own price rather than the default"""
+        return model_name in self._model_cost_table()
+    
+    @staticmethod
+    def _model_cost_table() -> Dict[str, int]:
+        """Model credit costs from settings"""
+        return {
             "gemma3_1b": settings.gemma3_1b_cost,
             "gemma3_4b": settings.gemma3_4b_cost,
             "Gemma3 1B": settings.gemma3_1b_cost,
             "Gemma3 4B": settings.gemma3_4b_cost,
         }
-        
-        return model_costs.get(model_name, 1)  # Default to 1 credit
     
     def process_model_usage(
         self, 
@@ -293,9 +358,9 @@ class BillingService:
         cost = self.get_model_cost(model_name)
         
         # Check if user has sufficient credits first
-        has_credits, check_message = self.check_sufficient_credits(user_id, cost)
+        has_credits, check_message, balance = self.check_sufficient_credits(user_id, cost)
         if not has_credits:
-            return False, check_message, self.get_user_balance(user_id) or 0
+            return False, check_message, balance or 0
         
         # Charge credits
         return self.charge_credits(
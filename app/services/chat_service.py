@@ -2,7 +2,7 @@
 Chat service for managing conversations and integrating ML with billing
 """
 import time
-from typing import Tuple, Optional, List, Dict, Any
+from typing import Tuple, Optional, List, Dict, Any, Iterator
 from sqlalchemy.orm import Session
 
 from app.services.billing_service import BillingService
@@ -47,6 +47,29 @@ class ChatService:
             if len(message) > 2000:
                 return False, "Message too long (max 2000 characters)", {}
 
+            # Get model cost
+            model_cost = self.billing_service.get_model_cost(model_name)
+            
+            # Check credits before touching the ML backend, which may load models
+            has_credits, credit_message, balance = self.billing_service.check_sufficient_credits(
+                user.id, model_cost
+            )
+            
+            if not has_credits:
+                # Try to fallback to cheaper model if user selected expensive one
+                fallback_model = self._get_fallback_model(model_name, balance or 0)
+                if fallback_model and fallback_model != model_name:
+                    logger.info("using_fallback_model", 
+                               user_id=user.id,
+                               requested_model=model_name,
+                               fallback_model=fallback_model,
+                               user_credits=balance)
+                    
+                    # Recursively call with fallback model
+                    return self.send_message(user, message, fallback_model, max_length, temperature)
+                
+                return False, credit_message, {"cost": model_cost, "user_credits": balance}
+            
             # Determine which ML service to use
             use_ollama_backend = use_ollama if use_ollama is not None else True  # Default to Ollama for speed
             ml_service_to_use = self.ml_service
@@ -83,33 +106,11 @@ class ChatService:
                     fallback = "Gemma3 1B"
                     if ml_service_to_use.is_model_available(fallback) or ml_service_to_use.reload_model(fallback):
                         model_name = fallback
+                        model_cost = self.billing_service.get_model_cost(model_name)
                     else:
                         available_models = ml_service_to_use.get_available_models()
                         return False, f"Model '{model_name}' not available. Available: {available_models}", {}
 
-            # Get model cost
-            model_cost = self.billing_service.get_model_cost(model_name)
-            
-            # Check credits before generation
-            has_credits, credit_message = self.billing_service.check_sufficient_credits(
-                user.id, model_cost
-            )
-            
-            if not has_credits:
-                # Try to fallback to cheaper model if user selected expensive one
-                fallback_model = self._get_fallback_model(model_name, user.credits)
-                if fallback_model and fallback_model != model_name:
-                    logger.info("using_fallback_model", 
-                               user_id=user.id,
-                               requested_model=model_name,
-                               fallback_model=fallback_model,
-                               user_credits=user.credits)
-                    
-                    # Recursively call with fallback model
-                    return self.send_message(user, message, fallback_model, max_length, temperature)
-                
-                return False, credit_message, {"cost": model_cost, "user_credits": user.credits}
-            
             # Generate AI response
             logger.info("generating_chat_response",
                        user_id=user.id,
@@ -202,7 +203,153 @@ class ChatService:
                         error=str(e),
                         total_time_ms=total_time)
             return False, f"Unexpected error: {str(e)}", {}
-    
+
+    def stream_message(
+        self,
+        user: User,
+        message: str,
+        model_name: str,
+        max_length: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> Tuple[bool, str, Optional[Iterator[Dict[str, Any]]]]:
+        """
+        Check credits for a message and stream the AI response
+        Returns (success, error, events) where events yields token dicts and a final summary
+        """
+        if not message.strip():
+            return False, "Message cannot be empty", None
+
+        if len(message) > 2000:
+            return False, "Message too long (max 2000 characters)", None
+
+        model_cost = self.billing_service.get_model_cost(model_name)
+
+        # Check credits before touching the ML backend, which may load models
+        has_credits, credit_message, _ = self.billing_service.check_sufficient_credits(user.id, model_cost)
+        if not has_credits:
+            return False, credit_message, None
+
+        if not self.ml_service.is_model_available(model_name) and not self.ml_service.reload_model(model_name):
+            available_models = self.ml_service.get_available_models()
+            return False, f"Model '{model_name}' not available. Available: {available_models}", None
+
+        return True, "", self._stream_events(
+            user.id, message, model_name, model_cost, max_length, temperature
+        )
+
+    def _stream_events(
+        self,
+        user_id: int,
+        message: str,
+        model_name: str,
+        model_cost: int,
+        max_length: Optional[int],
+        temperature: Optional[float]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Charge, yield generated tokens, then record the interaction and yield billing summary
+        A client disconnect keeps the charge and records the partial response
+        """
+        # Charged on first pull, so a stream closed before it starts costs nothing
+        charge_success, charge_message, remaining_credits = self.billing_service.charge_credits(
+            user_id=user_id,
+            amount=model_cost,
+            description=f"Chat with {model_name}: {message[:50]}..."
+        )
+        if not charge_success:
+            yield {
+                "error": charge_message,
+                "credits_charged": 0,
+                "remaining_credits": remaining_credits
+            }
+            return
+
+        start_time = time.time()
+        chunks = []
+        tokens = self.ml_service.stream_response(message, model_name, max_length, temperature)
+
+        try:
+            for chunk in tokens:
+                chunks.append(chunk)
+                yield {"token": chunk}
+        except GeneratorExit:
+            # Closed by the client mid-stream; not an Exception, so handled apart
+            try:
+                self._record_stream_interaction(
+                    user_id, message, model_name, model_cost, "".join(chunks), start_time,
+                    completed=False
+                )
+            except Exception as e:
+                logger.error("chat_stream_record_failed", user_id=user_id, model=model_name, error=str(e))
+            raise
+        except Exception as e:
+            logger.error("chat_stream_failed", user_id=user_id, model=model_name, error=str(e))
+
+            _, _, remaining_credits = self.billing_service.refund_credits(
+                user_id=user_id,
+                amount=model_cost,
+                description=f"Refund for failed chat with {model_name}"
+            )
+            yield {
+                "error": "Generation failed",
+                "credits_charged": 0,
+                "remaining_credits": remaining_credits
+            }
+            return
+        finally:
+            # Stops the backend stream if we stopped pulling from it early
+            tokens.close()
+
+        interaction, processing_time = self._record_stream_interaction(
+            user_id, message, model_name, model_cost, "".join(chunks), start_time,
+            completed=True
+        )
+
+        yield {
+            "done": True,
+            "interaction_id": interaction.id,
+            "model_used": model_name,
+            "credits_charged": model_cost,
+            "remaining_credits": remaining_credits,
+            "processing_time_ms": processing_time
+        }
+
+    def _record_stream_interaction(
+        self,
+        user_id: int,
+        message: str,
+        model_name: str,
+        model_cost: int,
+        ai_response: str,
+        start_time: float,
+        completed: bool
+    ) -> Tuple[Any, int]:
+        """
+        Record a charged streamed interaction
+        Returns (interaction, processing_time_ms)
+        """
+        processing_time = int((time.time() - start_time) * 1000)
+
+        interaction = ModelInteractionCRUD.create(
+            db=self.db,
+            user_id=user_id,
+            model_name=model_name,
+            prompt=message,
+            response=ai_response,
+            credits_charged=model_cost,
+            processing_time_ms=processing_time
+        )
+
+        log_model_interaction(
+            logger, user_id, model_name, model_cost, processing_time,
+            interaction_id=interaction.id,
+            message_length=len(message),
+            response_length=len(ai_response),
+            streamed=True,
+            completed=completed
+        )
+        return interaction, processing_time
+
     def get_conversation_history(
         self, 
         user_id: int, 
@@ -222,7 +369,7 @@ class ChatService:
             for interaction in interactions:
                 history.append({
                     "id": interaction.id,
-                    "timestamp": interaction.created_at.isoformat(),
+                    "timestamp": interaction.created_at,
                     "model": interaction.model_name,
                     "prompt": interaction.prompt,
                     "response": interaction.response,
@@ -288,7 +435,7 @@ class ChatService:
                     "model": interaction.model_name,
                     "credits_charged": interaction.credits_charged,
                     "processing_time_ms": interaction.processing_time_ms,
-                    "timestamp": interaction.created_at.isoformat()
+                    "timestamp": interaction.created_at
                 })
             
             return history, total_count
@@ -378,6 +525,31 @@ class ChatService:
                 "device": "unknown"
             }
     
+    def estimate_response_costs(self, model_names: List[str]) -> List[Dict[str, Any]]:
+        """Estimate costs for several models, looking up prices once"""
+        try:
+            costs = self.billing_service.get_model_costs(model_names)
+            
+            estimates = []
+            for model_name in model_names:
+                cost = costs[model_name]
+                is_available = self.ml_service.is_model_available(model_name)
+                model_info = self.ml_service.get_model_info(model_name) if is_available else None
+                
+                estimates.append({
+                    "model_name": model_name,
+                    "cost": cost,
+                    "available": is_available,
+                    "description": f"Costs {cost} credit(s) per message",
+                    "device": model_info.get("device") if model_info else "unknown"
+                })
+            
+            return estimates
+            
+        except Exception as e:
+            logger.error("estimate_costs_failed", models=model_names, error=str(e))
+            return [self.estimate_response_cost(model_name) for model_name in model_names]
+    
     def validate_message(self, message: str) -> Tuple[bool, str]:
         """Validate chat message"""
         if not message or not message.strip():
@@ -22,8 +22,9 @@ class MonitoringService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_system_metrics(self) -> Dict[str, Any]:
-        """Get current system performance metrics"""
+    @staticmethod
+    def get_system_metrics() -> Dict[str, Any]:
+        """Get current system performance metrics (host only, no database access)"""
         try:
             # CPU and Memory
             cpu_percent = psutil.cpu_percent(interval=1)
@@ -352,11 +353,12 @@ class MonitoringService:
                 "error": str(e)
             }
     
-    def get_health_status(self) -> Dict[str, Any]:
-        """Get system health status"""
+    def get_health_status(self, system_metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get system health status, from already collected metrics if given"""
         try:
             # Get current system metrics
-            system_metrics = self.get_system_metrics()
+            if system_metrics is None:
+                system_metrics = self.get_system_metrics()
             
             # Determine health status
             status = "healthy"
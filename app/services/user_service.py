@@ -1,12 +1,15 @@
 """
 User service for authentication and user management
 """
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from app.models import User, UserSession
 from app.models.crud import UserCRUD, UserSessionCRUD
+from app.services.billing_service import cache_user_balance
 from app.utils.auth import (
     hash_password, 
     verify_password, 
@@ -16,12 +19,28 @@ from app.utils.auth import (
     validate_password_strength,
     validate_email
 )
+from app.utils.cache import get_shared_cache
 from app.utils.logging import get_logger, log_user_action
+from app.utils.transactions import atomic_transaction
 from config import settings
 
 
 logger = get_logger(__name__)
 
+# How long a validated session is trusted without re-checking the database
+SESSION_CACHE_TTL = 60
+
+
+def _session_cache_key(cache, user_id: str, token_hash: str) -> str:
+    """
+    Cache key for a validated session
+    Includes the user's session version, which logout replaces with a fresh
+    value so every cached session of the user stops matching at once; the
+    version only needs to outlive entries written under the previous one
+    """
+    version = cache.get(f"sess_ver:{user_id}") or 0
+    return f"sess:{user_id}:{version}:{token_hash}"
+
 
 class UserService:
     """Service for user authentication and management"""
@@ -121,12 +140,15 @@ class UserService:
             token_hash = get_token_hash(token)
             expires_at = datetime.utcnow() + expires_delta
             
-            UserSessionCRUD.create(
-                db=self.db,
-                user_id=user.id,
-                token_hash=token_hash,
-                expires_at=expires_at
-            )
+            # Single INSERT and commit; the session row is never read back
+            with atomic_transaction(self.db):
+                self.db.execute(
+                    insert(UserSession).values(
+                        user_id=user.id,
+                        token_hash=token_hash,
+                        expires_at=expires_at
+                    )
+                )
             
             log_user_action(logger, user.id, "session_created", username=user.username)
             return True, "Session created successfully", token
@@ -140,6 +162,22 @@ class UserService:
         Get user by JWT token
         Returns user if token is valid, None otherwise
         """
+        user_id = self.get_user_id_by_token(token)
+        if user_id is None:
+            return None
+        
+        try:
+            return UserCRUD.get_by_id(self.db, user_id)
+            
+        except Exception as e:
+            logger.error("token_validation_failed", error=str(e))
+            return None
+    
+    def get_user_id_by_token(self, token: str) -> Optional[int]:
+        """
+        Get user id by JWT token without loading the user
+        Returns user id if token is valid and its session exists, None otherwise
+        """
         try:
             # Decode token
             payload = decode_access_token(token)
@@ -150,15 +188,24 @@ class UserService:
             if not user_id:
                 return None
             
-            # Check if session exists in database
+            # Sessions already validated are remembered in the shared cache
             token_hash = get_token_hash(token)
-            session = UserSessionCRUD.get_by_token_hash(self.db, token_hash)
-            if not session:
-                return None
+            cache = get_shared_cache()
+            cache_key = _session_cache_key(cache, user_id, token_hash) if cache is not None else None
             
-            # Get user
-            user = UserCRUD.get_by_id(self.db, int(user_id))
-            return user
+            if cache is None or cache.get(cache_key) is None:
+                # Check if session exists in database
+                session = UserSessionCRUD.get_by_token_hash(self.db, token_hash)
+                if not session:
+                    return None
+                
+                if cache is not None:
+                    # Never outlive the token itself
+                    ttl = min(SESSION_CACHE_TTL, int(payload.get("exp", 0) - time.time()))
+                    if ttl > 0:
+                        cache.set(cache_key, int(user_id), ttl)
+            
+            return int(user_id)
             
         except Exception as e:
             logger.error("token_validation_failed", error=str(e))
@@ -175,8 +222,19 @@ class UserService:
             # Get session
             session = UserSessionCRUD.get_by_token_hash(self.db, token_hash)
             if session:
-                # Delete session
+                # Delete all of the user's sessions, then drop their cached
+                # validations; in the other order a concurrent request could
+                # re-cache a row that is about to be deleted
                 UserSessionCRUD.delete_by_user(self.db, session.user_id)
+                
+                cache = get_shared_cache()
+                if cache is not None:
+                    cache.set(
+                        f"sess_ver:{session.user_id}",
+                        time.time_ns(),
+                        2 * SESSION_CACHE_TTL
+                    )
+                
                 log_user_action(logger, session.user_id, "logout_success")
                 return True
             
@@ -194,6 +252,7 @@ class UserService:
         try:
             success = UserCRUD.update_credits(self.db, user_id, new_credits)
             if success:
+                cache_user_balance(user_id, new_credits)
                 log_user_action(logger, user_id, "credits_updated", new_credits=new_credits)
             return success
             
@@ -201,6 +260,29 @@ class UserService:
             logger.error("credits_update_failed", error=str(e), user_id=user_id)
             return False
     
+    def add_credits(self, user_id: int, amount: int) -> Optional[int]:
+        """
+        Atomically add credits to user account
+        Returns new balance or None if user not found
+        """
+        try:
+            with atomic_transaction(self.db):
+                new_credits = self.db.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(credits=User.credits + amount)
+                    .returning(User.credits)
+                ).scalar_one_or_none()
+            
+            if new_credits is not None:
+                cache_user_balance(user_id, new_credits)
+                log_user_action(logger, user_id, "credits_added", amount=amount, new_credits=new_credits)
+            return new_credits
+            
+        except Exception as e:
+            logger.error("credits_add_failed", error=str(e), user_id=user_id, amount=amount)
+            return None
+    
     def get_user_info(self, user_id: int) -> Optional[dict]:
         """
         Get user information
@@ -170,20 +170,23 @@ class AdminInterface:
             )
             
             if response.status_code == 200:
-                data = response.json()
-                
                 if format == "csv":
-                    content = data.get("content", "")
-                    filename = data.get("filename", f"usage_report_{datetime.now().strftime('%Y%m%d')}.csv")
+                    # CSV is streamed as a file attachment
+                    disposition = response.headers.get("Content-Disposition", "")
+                    if "filename=" in disposition:
+                        filename = disposition.split("filename=", 1)[1].strip('"')
+                    else:
+                        filename = f"usage_report_{datetime.now().strftime('%Y%m%d')}.csv"
                     
                     # Save to file
-                    with open(filename, 'w') as f:
-                        f.write(content)
+                    with open(filename, 'w', newline='') as f:
+                        f.write(response.text)
                     
                     return filename, f"✅ CSV report generated: {filename}"
                 else:
                     # JSON format - return formatted string
                     import json
+                    data = response.json()
                     report_json = json.dumps(data.get("report", {}), indent=2)
                     return report_json, f"✅ JSON report generated for last {days} days"
             else:
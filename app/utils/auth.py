@@ -2,7 +2,9 @@
 Authentication utilities for password hashing and JWT tokens
 """
 import hashlib
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
 from jose import JWTError, jwt
@@ -42,9 +44,28 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
 def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     """Decode and validate a JWT access token"""
+    payload = _decode_token_signature(token)
+    if payload is None:
+        return None
+    
+    # Expiry is checked on every call since decoded payloads are cached
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        return None
+    
+    return dict(payload)
+
+
+@lru_cache(maxsize=10_000)
+def _decode_token_signature(token: str) -> Optional[Dict[str, Any]]:
+    """Verify token signature and decode payload (memoized per token)"""
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
+        return jwt.decode(
+            token,
+            settings.secret_key,
+            algorithms=[settings.algorithm],
+            options={"verify_exp": False}
+        )
     except JWTError:
         return None
 
@@ -0,0 +1,219 @@
+"""
+Caching utilities with optional Redis backend
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import orjson
+
+from app.utils.logging import get_logger
+from config import settings
+
+
+logger = get_logger(__name__)
+
+
+class LocalCache:
+    """In-process TTL cache used when Redis is not configured"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get cached value or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """Cache value for ttl seconds"""
+        with self._lock:
+            self._data.pop(key, None)
+
+            # Evict oldest entries if cache is full
+            while len(self._data) >= self.max_entries:
+                self._data.popitem(last=False)
+
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def add(self, key: str, value: Any, ttl: int) -> bool:
+        """
+        Cache value for ttl seconds only if the key is not already cached
+        Returns True if the value was stored
+        """
+        with self._lock:
+            if self.get(key) is not None:
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def incr(self, key: str, ttl: int) -> int:
+        """Increment a counter that expires ttl seconds after creation"""
+        with self._lock:
+            now = time.monotonic()
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                self.set(key, 1, ttl)
+                return 1
+
+            expires_at, value = entry
+            self._data[key] = (expires_at, value + 1)
+            return value + 1
+
+    def delete(self, key: str) -> None:
+        """Remove cached value"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all cached values"""
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Redis-backed cache shared between workers"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get cached value or None if missing"""
+        try:
+            raw = self.client.get(key)
+            return orjson.loads(raw) if raw is not None else None
+        except Exception as e:
+            logger.error("redis_get_failed", key=key, error=str(e))
+            return None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """Cache value for ttl seconds"""
+        try:
+            self.client.set(key, orjson.dumps(value, option=orjson.OPT_NAIVE_UTC), ex=ttl)
+        except Exception as e:
+            logger.error("redis_set_failed", key=key, error=str(e))
+
+    def add(self, key: str, value: Any, ttl: int) -> bool:
+        """
+        Cache value for ttl seconds only if the key is not already cached (SET NX)
+        Returns True if the value was stored
+        """
+        try:
+            return bool(self.client.set(key, orjson.dumps(value, option=orjson.OPT_NAIVE_UTC), ex=ttl, nx=True))
+        except Exception as e:
+            logger.error("redis_set_failed", key=key, error=str(e))
+            return False
+
+    def incr(self, key: str, ttl: int) -> int:
+        """Increment a counter that expires ttl seconds after creation"""
+        try:
+            pipe = self.client.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, ttl, nx=True)
+            count, _ = pipe.execute()
+            return count
+        except Exception as e:
+            logger.error("redis_incr_failed", key=key, error=str(e))
+            return 0
+
+    def delete(self, key: str) -> None:
+        """Remove cached value"""
+        try:
+            self.client.delete(key)
+        except Exception as e:
+            logger.error("redis_delete_failed", key=key, error=str(e))
+
+
+class AsyncRedisCounters:
+    """Redis fixed-window counters for use on the event loop without blocking it"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as aioredis
+
+        self.client = aioredis.Redis.from_url(url)
+
+    async def incr(self, key: str, ttl: int) -> int:
+        """Increment a counter that expires ttl seconds after creation"""
+        try:
+            pipe = self.client.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, ttl, nx=True)
+            count, _ = await pipe.execute()
+            return count
+        except Exception as e:
+            logger.error("redis_incr_failed", key=key, error=str(e))
+            return 0
+
+
+def create_async_redis_counters() -> Optional[AsyncRedisCounters]:
+    """
+    Create counters shared between workers for async callers
+    Returns None without Redis
+    """
+    if get_shared_cache() is None:
+        return None
+
+    try:
+        return AsyncRedisCounters(settings.redis_url)
+    except Exception as e:
+        logger.error("redis_cache_init_failed", error=str(e))
+        return None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Get the application cache
+    Uses Redis when REDIS_URL is configured, otherwise an in-process cache
+    """
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _create_redis_cache() or LocalCache()
+
+    return _cache
+
+
+def get_shared_cache() -> Optional[RedisCache]:
+    """
+    Get the cache shared between workers
+    Returns None without Redis; used for per-user state that must not
+    diverge between processes
+    """
+    cache = get_cache()
+    return cache if isinstance(cache, RedisCache) else None
+
+
+def _create_redis_cache() -> Optional[RedisCache]:
+    """Create Redis cache backend from settings"""
+    if settings.redis_url:
+        try:
+            cache = RedisCache(settings.redis_url)
+            # The URL may carry a password, so it is not logged
+            logger.info("redis_cache_initialized")
+            return cache
+        except ImportError:
+            logger.error("redis_import_failed", reason="redis library not installed")
+        except Exception as e:
+            logger.error("redis_cache_init_failed", error=str(e))
+
+    return None
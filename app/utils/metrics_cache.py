@@ -0,0 +1,57 @@
+"""
+Shared system metrics snapshot refreshed in the background
+"""
+import asyncio
+from typing import Any, Dict, Optional
+
+from app.utils.logging import get_logger
+from app.utils.performance_monitor import system_monitor
+
+
+logger = get_logger(__name__)
+
+
+class MetricsSnapshot:
+    """
+    Latest system_monitor metrics, refreshed by a single background task
+    Endpoints and middleware read the snapshot instead of probing psutil/CUDA per request
+    """
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        # Empty until the first refresh; readers treat missing sections as 0
+        self.last: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self) -> Dict[str, Any]:
+        """Get latest snapshot without blocking; empty before the first refresh"""
+        return self.last
+
+    def start(self) -> None:
+        """Start refreshing on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+            logger.info("metrics_snapshot_started", interval=self.interval)
+
+    async def stop(self) -> None:
+        """Stop refreshing"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        """Collect metrics off the event loop every interval seconds"""
+        while True:
+            try:
+                self.last = await asyncio.to_thread(system_monitor.get_current_metrics)
+            except Exception as e:
+                logger.error("metrics_snapshot_refresh_failed", error=str(e))
+            await asyncio.sleep(self.interval)
+
+
+# Global snapshot instance
+metrics_snapshot = MetricsSnapshot()
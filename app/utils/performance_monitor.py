@@ -1,6 +1,7 @@
 """
 Performance monitoring utilities for ML service optimization
 """
+import heapq
 import time
 import psutil
 import threading
@@ -9,11 +10,27 @@ from collections import deque, defaultdict
 from datetime import datetime, timedelta
 import statistics
 
+from app.utils.cache import LocalCache
 from app.utils.logging import get_logger
 
 
 logger = get_logger(__name__)
 
+# Analyses walk every stored sample, so dashboards polling /analysis and
+# /recommendations share one result per window for this long
+ANALYSIS_CACHE_TTL = 30
+
+OPTIMIZATION_SUGGESTIONS = (
+    "Enable response caching for frequently requested content",
+    "Implement model lazy loading to reduce memory usage",
+    "Use model quantization for large models",
+    "Monitor and cleanup expired cache entries regularly",
+    "Implement request rate limiting to prevent overload",
+    "Use connection pooling for database operations",
+    "Enable GPU memory optimization if available",
+    "Implement graceful degradation for high load scenarios"
+)
+
 
 class PerformanceMetrics:
     """Collect and analyze performance metrics"""
@@ -225,13 +242,23 @@ class RequestTracker:
     def __init__(self):
         self.requests = deque(maxlen=10000)
         self.lock = threading.RLock()
+        # Raw records appended per request without taking the lock; deque.append
+        # is atomic, and records are moved into self.requests in batches on read
+        self._pending = deque(maxlen=10000)
         
     def record_request(self, endpoint: str, method: str, duration_ms: int, 
                       status_code: int, user_id: Optional[int] = None):
         """Record API request metrics"""
-        with self.lock:
-            self.requests.append({
-                "timestamp": datetime.now(),
+        self._pending.append((time.time(), endpoint, method, duration_ms, status_code, user_id))
+    
+    def _flush_pending(self):
+        """Move pending records into self.requests; caller holds the lock"""
+        pending = self._pending
+        append = self.requests.append
+        while pending:
+            timestamp, endpoint, method, duration_ms, status_code, user_id = pending.popleft()
+            append({
+                "timestamp": datetime.fromtimestamp(timestamp),
                 "endpoint": endpoint,
                 "method": method,
                 "duration_ms": duration_ms,
@@ -242,6 +269,7 @@ class RequestTracker:
     def get_request_stats(self, window_minutes: int = 60) -> Dict[str, Any]:
         """Get request statistics for time window"""
         with self.lock:
+            self._flush_pending()
             cutoff_time = datetime.now() - timedelta(minutes=window_minutes)
             recent_requests = [
                 req for req in self.requests
@@ -274,7 +302,7 @@ class RequestTracker:
                 "max_duration_ms": max(durations),
                 "p95_duration_ms": statistics.quantiles(durations, n=20)[18] if len(durations) >= 20 else max(durations),
                 "status_codes": dict(status_codes),
-                "top_endpoints": dict(sorted(endpoints.items(), key=lambda x: x[1], reverse=True)[:10]),
+                "top_endpoints": dict(heapq.nlargest(10, endpoints.items(), key=lambda x: x[1])),
                 "methods": dict(methods),
                 "error_rate": sum(1 for req in recent_requests if req["status_code"] >= 400) / len(recent_requests),
                 "window_minutes": window_minutes
@@ -283,14 +311,15 @@ class RequestTracker:
     def get_slowest_requests(self, limit: int = 10, window_minutes: int = 60) -> List[Dict[str, Any]]:
         """Get slowest requests in time window"""
         with self.lock:
+            self._flush_pending()
             cutoff_time = datetime.now() - timedelta(minutes=window_minutes)
             recent_requests = [
                 req for req in self.requests
                 if req["timestamp"] >= cutoff_time
             ]
             
-            # Sort by duration and return top N
-            slowest = sorted(recent_requests, key=lambda x: x["duration_ms"], reverse=True)[:limit]
+            # Select top N by duration without sorting the whole window
+            slowest = heapq.nlargest(limit, recent_requests, key=lambda x: x["duration_ms"])
             
             return [
                 {
@@ -310,9 +339,18 @@ class PerformanceOptimizer:
     def __init__(self, system_monitor: SystemMonitor, request_tracker: RequestTracker):
         self.system_monitor = system_monitor
         self.request_tracker = request_tracker
+        self._analysis_cache = LocalCache(max_entries=4)
         
     def analyze_performance(self, window_minutes: int = 60) -> Dict[str, Any]:
-        """Analyze system performance and provide recommendations"""
+        """Analyze system performance and provide recommendations, cached per window"""
+        analysis = self._analysis_cache.get(str(window_minutes))
+        if analysis is None:
+            analysis = self._analyze(window_minutes)
+            self._analysis_cache.set(str(window_minutes), analysis, ANALYSIS_CACHE_TTL)
+        return analysis
+    
+    def _analyze(self, window_minutes: int) -> Dict[str, Any]:
+        """Build a performance analysis from stored samples"""
         system_report = self.system_monitor.get_performance_report(window_minutes)
         request_stats = self.request_tracker.get_request_stats(window_minutes)
         
@@ -368,16 +406,7 @@ class PerformanceOptimizer:
     
     def get_optimization_suggestions(self) -> List[str]:
         """Get general optimization suggestions"""
-        return [
-            "Enable response caching for frequently requested content",
-            "Implement model lazy loading to reduce memory usage",
-            "Use model quantization for large models",
-            "Monitor and cleanup expired cache entries regularly",
-            "Implement request rate limiting to prevent overload",
-            "Use connection pooling for database operations",
-            "Enable GPU memory optimization if available",
-            "Implement graceful degradation for high load scenarios"
-        ]
+        return list(OPTIMIZATION_SUGGESTIONS)
 
 
 # Global instances
@@ -2,7 +2,7 @@
 Configuration settings for ML Chat Billing Service
 """
 import os
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -11,6 +11,9 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./ml_chat_service.db"
+    # Connection pool (ignored for SQLite)
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
     
     # JWT Settings
     secret_key: str = "your-secret-key-change-in-production"
@@ -23,6 +26,26 @@ class Settings(BaseSettings):
     # Real Gemma 3 IT models
     gemma3_1b_model: str = "google/gemma-3-1b-it"
     gemma3_4b_model: str = "google/gemma-3-4b-it"
+    # Loaded concurrently at startup (skipped in Ollama mode)
+    preload_models: List[str] = ["gemma3_4b"]
+    # Weight quantization for Gemma3 4B: "none", "int8" (bitsandbytes LLM.int8) or
+    # "nf4" (4-bit, fits 8GB GPUs next to 1B); 1B stays bf16 since its small
+    # matmuls gain little from low-bit kernels
+    gemma3_4b_quantization: str = "none"
+    # torch.compile HF models after load (slow first load, faster decode on CUDA)
+    compile_model: bool = False
+    # Prompts longer than this (tokens) keep cold KV cache layers in CPU memory
+    # on CUDA (0 disables)
+    kv_offload_min_tokens: int = 1024
+    # 4-bit HQQ KV cache for uncompiled models; needs the optional hqq package
+    kv_cache_quantization: bool = False
+    # Threads running blocking inference and model management
+    ml_workers: int = 1
+    # Concurrent /ml/generate requests are batched into one model.generate call
+    ml_batch_size: int = 8
+    ml_batch_wait_ms: int = 10
+    # Repeated /ml/generate requests are answered from an LRU cache (0 disables)
+    response_cache_size: int = 1024
     
     # Billing
     initial_credits: int = 100
@@ -47,6 +70,9 @@ class Settings(BaseSettings):
     use_ollama: bool = True
     ollama_base_url: str = "http://127.0.0.1:11434"
     
+    # Caching (Redis is optional; an in-process cache is used otherwise)
+    redis_url: Optional[str] = None
+    
     class Config:
         env_file = ".env"
 
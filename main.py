@@ -12,22 +12,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from config import settings
 from app.api.auth import router as auth_router
 from app.api.billing import router as billing_router
-from app.api.ml import router as ml_router
+from app.api.ml import router as ml_router, startup_ml_service, shutdown_ml_service
 from app.api.chat import router as chat_router
 from app.api.monitoring import router as monitoring_router
 from app.api.admin import router as admin_router
 from app.api.performance import router as performance_router
+from app.api.responses import ORJSONResponse
 from app.api.middleware import (
     LoggingMiddleware,
-    AuthLoggingMiddleware,
     RateLimitingMiddleware,
-    SecurityHeadersMiddleware
+    SecurityMiddleware
 )
 from app.api.performance_middleware import (
     PerformanceMiddleware,
-    MemoryMonitoringMiddleware,
-    HealthCheckMiddleware
+    MemoryMonitoringMiddleware
 )
+from app.utils.metrics_cache import metrics_snapshot
 
 
 # Configure logging
@@ -49,12 +49,17 @@ async def lifespan(app: FastAPI):
     logger.info("Database initialized")
     
     # Load ML models
-    # TODO: Add model loading
+    await startup_ml_service()
+    
+    # Share one system metrics collector across endpoints and middleware
+    metrics_snapshot.start()
     
     logger.info("Service started successfully")
     yield
     
     logger.info("Shutting down ML Chat Billing Service...")
+    await metrics_snapshot.stop()
+    await shutdown_ml_service()
 
 
 # Create FastAPI app
@@ -66,11 +71,9 @@ app = FastAPI(
 )
 
 # Add custom middleware
-app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(SecurityMiddleware)
 app.add_middleware(PerformanceMiddleware, enable_detailed_logging=settings.debug)
 app.add_middleware(MemoryMonitoringMiddleware, memory_threshold=0.85)
-app.add_middleware(HealthCheckMiddleware)
-app.add_middleware(AuthLoggingMiddleware)
 app.add_middleware(LoggingMiddleware)
 if not settings.debug:
     app.add_middleware(RateLimitingMiddleware, calls_per_minute=100)
@@ -100,14 +103,28 @@ async def root():
     return {"message": "ML Chat Billing Service is running"}
 
 
-@app.get("/health")
+@app.get("/health", response_class=ORJSONResponse)
 async def health_check():
     """Detailed health check"""
-    return {
-        "status": "healthy",
+    metrics = metrics_snapshot.get()
+    memory_usage = metrics.get("memory", {}).get("usage_percent", 0)
+    cpu_usage = metrics.get("cpu", {}).get("usage_percent", 0)
+    
+    if memory_usage > 95 or cpu_usage > 95:
+        status = "unhealthy"
+    elif memory_usage > 85 or cpu_usage > 85:
+        status = "degraded"
+    else:
+        status = "healthy"
+    
+    return ORJSONResponse({
+        "status": status,
         "service": "ML Chat Billing Service",
-        "version": "1.0.0"
-    }
+        "version": "1.0.0",
+        "timestamp": metrics.get("timestamp"),
+        "memory_usage_percent": memory_usage,
+        "cpu_usage_percent": cpu_usage
+    })
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+"""Index credit_transactions by period and type
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_credit_transactions_created_at_type',
+        'credit_transactions',
+        ['created_at', 'transaction_type'],
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_credit_transactions_created_at_type',
+        table_name='credit_transactions',
+        if_exists=True
+    )
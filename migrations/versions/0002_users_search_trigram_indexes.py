@@ -0,0 +1,48 @@
+"""Trigram indexes for admin user search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Trigram GIN indexes let ILIKE '%term%' avoid a sequential scan (PostgreSQL only)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_users_username_trgm',
+        'users',
+        ['username'],
+        postgresql_using='gin',
+        postgresql_ops={'username': 'gin_trgm_ops'},
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_users_email_trgm',
+        'users',
+        ['email'],
+        postgresql_using='gin',
+        postgresql_ops={'email': 'gin_trgm_ops'},
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_users_email_trgm', table_name='users', if_exists=True)
+    op.drop_index('ix_users_username_trgm', table_name='users', if_exists=True)
@@ -249,4 +249,16 @@ class TestBillingAPI:
         
         assert response.status_code == 200
         data = response.json()
-        assert data["cost"] == 1
\ No newline at end of file
+        assert data["cost"] == 1
+    
+    def test_get_model_cost_not_modified(self, client):
+        """Test model cost revalidation returns 304 for a matching ETag"""
+        response = client.get("/billing/model-cost/gemma3_1b")
+        
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        
+        response = client.get("/billing/model-cost/gemma3_1b", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.content == b""
@@ -65,7 +65,7 @@ class TestMonitoringAPI:
         user = create_test_user()
         token = get_test_token(user.email)
         
-        with patch('app.services.monitoring_service.MonitoringService.get_system_metrics') as mock_metrics:
+        with patch('app.api.monitoring.metrics_snapshot.get') as mock_metrics:
             mock_metrics.return_value = {
                 "timestamp": "2024-01-01T00:00:00",
                 "uptime_seconds": 3600,
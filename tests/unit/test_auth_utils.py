@@ -83,6 +83,13 @@ class TestJWTTokens:
         
         assert decoded is None
     
+    def test_decode_access_token_expired(self):
+        """Test decoding expired JWT token"""
+        data = {"sub": "123", "username": "testuser"}
+        token = create_access_token(data, timedelta(seconds=-1))
+        
+        assert decode_access_token(token) is None
+    
     def test_get_token_hash(self):
         """Test token hashing"""
         token = "sample_token_123"
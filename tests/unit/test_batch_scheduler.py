@@ -0,0 +1,122 @@
+"""
+Unit tests for BatchScheduler
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.ml.batch_scheduler import BatchScheduler
+from app.ml.ml_service import MLService
+
+
+@pytest.fixture
+def mock_ml_service():
+    """Create mock ML service that echoes prompts"""
+    ml_service = Mock(spec=MLService)
+    ml_service.generate_batch.side_effect = lambda prompts, *args: [
+        (True, f"echo {prompt}", 10) for prompt in prompts
+    ]
+    return ml_service
+
+
+@pytest.fixture
+def executor():
+    """Create single-thread executor"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+class TestBatchScheduler:
+    """Test BatchScheduler functionality"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_a_batch(self, mock_ml_service, executor):
+        """Test requests arriving together run in one generate_batch call"""
+        scheduler = BatchScheduler(mock_ml_service, executor, max_batch=8, max_wait_ms=50)
+
+        results = await asyncio.gather(
+            scheduler.submit("a", "Gemma3 1B"),
+            scheduler.submit("b", "Gemma3 1B"),
+            scheduler.submit("c", "Gemma3 1B")
+        )
+        await scheduler.stop()
+
+        assert results == [(True, "echo a", 10), (True, "echo b", 10), (True, "echo c", 10)]
+        mock_ml_service.generate_batch.assert_called_once_with(["a", "b", "c"], "Gemma3 1B", None, None)
+
+    @pytest.mark.asyncio
+    async def test_requests_grouped_by_parameters(self, mock_ml_service, executor):
+        """Test different models or parameters are not mixed in one batch"""
+        scheduler = BatchScheduler(mock_ml_service, executor, max_batch=8, max_wait_ms=50)
+
+        await asyncio.gather(
+            scheduler.submit("a", "Gemma3 1B"),
+            scheduler.submit("b", "Gemma3 4B"),
+            scheduler.submit("c", "Gemma3 1B", temperature=0.5)
+        )
+        await scheduler.stop()
+
+        assert mock_ml_service.generate_batch.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_model_aliases_share_a_batch(self, mock_ml_service, executor):
+        """Test different spellings of one model run in one generate_batch call"""
+        scheduler = BatchScheduler(mock_ml_service, executor, max_batch=8, max_wait_ms=50)
+
+        await asyncio.gather(
+            scheduler.submit("a", "Gemma3 1B"),
+            scheduler.submit("b", "1b"),
+            scheduler.submit("c", "gemma3_1b")
+        )
+        await scheduler.stop()
+
+        mock_ml_service.generate_batch.assert_called_once_with(["a", "b", "c"], "Gemma3 1B", None, None)
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_resolves_every_request(self, mock_ml_service, executor):
+        """Test an exception in the batch is returned to each waiting request"""
+        mock_ml_service.generate_batch.side_effect = RuntimeError("boom")
+        scheduler = BatchScheduler(mock_ml_service, executor, max_batch=8, max_wait_ms=50)
+
+        results = await asyncio.gather(
+            scheduler.submit("a", "Gemma3 1B"),
+            scheduler.submit("b", "Gemma3 1B")
+        )
+        await scheduler.stop()
+
+        assert all(success is False and "boom" in message for success, message, _ in results)
+
+    @pytest.mark.asyncio
+    async def test_missing_batch_results_resolve_as_errors(self, mock_ml_service, executor):
+        """Test requests without a result from generate_batch still get an answer"""
+        mock_ml_service.generate_batch.side_effect = lambda prompts, *args: [(True, "only one", 10)]
+        scheduler = BatchScheduler(mock_ml_service, executor, max_batch=8, max_wait_ms=50)
+
+        results = await asyncio.gather(
+            scheduler.submit("a", "Gemma3 1B"),
+            scheduler.submit("b", "Gemma3 1B")
+        )
+        await scheduler.stop()
+
+        assert results[0] == (True, "only one", 10)
+        assert results[1][0] is False
+
+    @pytest.mark.asyncio
+    async def test_loop_failure_resolves_pending_requests(self, mock_ml_service, executor):
+        """Test requests are answered with an error if the batching loop dies"""
+        scheduler = BatchScheduler(mock_ml_service, executor, max_batch=8, max_wait_ms=50)
+
+        with patch.object(scheduler, "_run_groups", side_effect=RuntimeError("loop crashed")):
+            results = await asyncio.wait_for(asyncio.gather(
+                scheduler.submit("a", "Gemma3 1B"),
+                scheduler.submit("b", "Gemma3 1B")
+            ), timeout=5)
+
+        assert all(success is False and "loop crashed" in message for success, message, _ in results)
+
+        # The next request starts a fresh loop
+        assert await scheduler.submit("c", "Gemma3 1B") == (True, "echo c", 10)
+        await scheduler.stop()
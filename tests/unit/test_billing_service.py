@@ -165,11 +165,25 @@ class TestBillingService:
         billing_service.add_credits(test_user.id, 30, "Add 1")
         billing_service.refund_credits(test_user.id, 10, "Refund 1")
         
-        transactions = billing_service.get_user_transactions(test_user.id)
+        transactions, total_count = billing_service.get_user_transactions(test_user.id)
         
         assert len(transactions) == 3
+        assert total_count == 3
         assert transactions[0].transaction_type in ["charge", "add", "refund"]
     
+    def test_get_user_transactions_total_count_spans_pages(self, billing_service, test_user):
+        """Test total count covers all transactions, not just the page"""
+        for i in range(5):
+            billing_service.add_credits(test_user.id, 1, f"Add {i}")
+        
+        page, total_count = billing_service.get_user_transactions(test_user.id, skip=2, limit=2)
+        assert len(page) == 2
+        assert total_count == 5
+        
+        page, total_count = billing_service.get_user_transactions(test_user.id, skip=10, limit=2)
+        assert page == []
+        assert total_count == 5
+    
     def test_get_transaction_summary(self, billing_service, test_user):
         """Test getting transaction summary"""
         # Perform various transactions
@@ -190,20 +204,23 @@ class TestBillingService:
     def test_check_sufficient_credits(self, billing_service, test_user):
         """Test checking sufficient credits"""
         # Should have enough for 50 credits
-        has_enough, message = billing_service.check_sufficient_credits(test_user.id, 50)
+        has_enough, message, balance = billing_service.check_sufficient_credits(test_user.id, 50)
         assert has_enough is True
         assert "Sufficient credits" in message
+        assert balance == 100
         
         # Should not have enough for 150 credits
-        has_enough, message = billing_service.check_sufficient_credits(test_user.id, 150)
+        has_enough, message, balance = billing_service.check_sufficient_credits(test_user.id, 150)
         assert has_enough is False
         assert "Insufficient credits" in message
+        assert balance == 100
     
     def test_check_sufficient_credits_user_not_found(self, billing_service):
         """Test checking credits for non-existent user"""
-        has_enough, message = billing_service.check_sufficient_credits(999, 50)
+        has_enough, message, balance = billing_service.check_sufficient_credits(999, 50)
         assert has_enough is False
         assert "User not found" in message
+        assert balance is None
     
     def test_get_model_cost(self, billing_service):
         """Test getting model costs"""
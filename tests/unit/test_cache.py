@@ -0,0 +1,71 @@
+"""
+Unit tests for caching utilities
+"""
+import pytest
+from unittest.mock import patch
+
+from app.utils.cache import LocalCache
+
+
+@pytest.fixture
+def cache():
+    """Create LocalCache instance"""
+    return LocalCache(max_entries=3)
+
+
+class TestLocalCache:
+    """Test LocalCache functionality"""
+
+    def test_set_and_get(self, cache):
+        """Test caching a value"""
+        cache.set("key", {"value": 1}, ttl=60)
+
+        assert cache.get("key") == {"value": 1}
+
+    def test_get_missing(self, cache):
+        """Test getting a missing key"""
+        assert cache.get("missing") is None
+
+    def test_expired_entry(self, cache):
+        """Test expired entries are not returned"""
+        with patch("app.utils.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value", ttl=10)
+
+        with patch("app.utils.cache.time.monotonic", return_value=111.0):
+            assert cache.get("key") is None
+
+    def test_eviction_when_full(self, cache):
+        """Test oldest entries are evicted when cache is full"""
+        for i in range(4):
+            cache.set(f"key{i}", i, ttl=60)
+
+        assert cache.get("key0") is None
+        assert cache.get("key3") == 3
+
+    def test_delete(self, cache):
+        """Test deleting a value"""
+        cache.set("key", "value", ttl=60)
+        cache.delete("key")
+
+        assert cache.get("key") is None
+
+    def test_add_only_when_missing(self, cache):
+        """Test add does not overwrite a cached value"""
+        assert cache.add("key", "first", ttl=60) is True
+        assert cache.add("key", "second", ttl=60) is False
+
+        assert cache.get("key") == "first"
+
+    def test_incr(self, cache):
+        """Test incrementing a counter"""
+        assert cache.incr("counter", ttl=60) == 1
+        assert cache.incr("counter", ttl=60) == 2
+
+    def test_incr_expired(self, cache):
+        """Test expired counters start again"""
+        with patch("app.utils.cache.time.monotonic", return_value=100.0):
+            cache.incr("counter", ttl=10)
+            cache.incr("counter", ttl=10)
+
+        with patch("app.utils.cache.time.monotonic", return_value=111.0):
+            assert cache.incr("counter", ttl=10) == 1
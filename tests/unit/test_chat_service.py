@@ -2,6 +2,7 @@
 Unit tests for ChatService
 """
 import pytest
+from datetime import datetime
 from unittest.mock import Mock, patch
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -113,6 +114,21 @@ class TestChatService:
         assert success is False
         assert "insufficient" in response.lower() or "credits" in response.lower()
     
+    def test_send_message_no_credits_skips_ml(self, chat_service, test_user, mock_ml_service):
+        """Test credit check rejects the message before any model work"""
+        chat_service.billing_service.charge_credits(test_user.id, 100)
+
+        success, response, metadata = chat_service.send_message(
+            user=test_user,
+            message="Hello",
+            model_name="Gemma3 1B"
+        )
+
+        assert success is False
+        assert "insufficient" in response.lower()
+        mock_ml_service.reload_model.assert_not_called()
+        mock_ml_service.generate_response.assert_not_called()
+
     def test_send_message_model_unavailable(self, chat_service, test_user, mock_ml_service):
         """Test sending message with unavailable model"""
         # Mock model as unavailable
@@ -154,6 +170,8 @@ class TestChatService:
         assert all("id" in item for item in history)
         assert all("prompt" in item for item in history)
         assert all("response" in item for item in history)
+        # Left as datetimes so responses serialize them like other endpoints
+        assert all(isinstance(item["timestamp"], datetime) for item in history)
     
     def test_get_user_chat_stats(self, chat_service, test_user):
         """Test getting user chat statistics"""
@@ -181,6 +199,116 @@ class TestChatService:
         assert cost_info["model_name"] == "Gemma3 1B"
         assert cost_info["cost"] == 1
     
+    def test_stream_message_success(self, chat_service, test_user, mock_ml_service):
+        """Test streaming charges on start and ends with a billing summary"""
+        mock_ml_service.stream_response.return_value = (t for t in ["Mock", " AI", " response"])
+
+        success, error, events = chat_service.stream_message(
+            user=test_user,
+            message="Hello, how are you?",
+            model_name="Gemma3 1B"
+        )
+
+        assert success is True
+        events = list(events)
+        assert [e["token"] for e in events[:-1]] == ["Mock", " AI", " response"]
+        assert events[-1]["done"] is True
+        assert events[-1]["credits_charged"] == 1
+        assert events[-1]["remaining_credits"] == 99
+        assert events[-1]["interaction_id"] is not None
+
+    def test_stream_message_refunds_on_failure(self, chat_service, test_user, mock_ml_service):
+        """Test failed generation refunds the charge"""
+        def failing_stream(*args, **kwargs):
+            yield "Partial"
+            raise RuntimeError("generation crashed")
+
+        mock_ml_service.stream_response.side_effect = failing_stream
+
+        success, error, events = chat_service.stream_message(
+            user=test_user,
+            message="Hello",
+            model_name="Gemma3 1B"
+        )
+
+        events = list(events)
+        assert events[-1]["error"] == "Generation failed"
+        assert events[-1]["credits_charged"] == 0
+        assert events[-1]["remaining_credits"] == 100
+
+    def test_stream_message_insufficient_credits(self, chat_service, test_user):
+        """Test streaming is rejected before generation without credits"""
+        chat_service.billing_service.charge_credits(test_user.id, 100)
+
+        success, error, events = chat_service.stream_message(
+            user=test_user,
+            message="Hello",
+            model_name="Gemma3 1B"
+        )
+
+        assert success is False
+        assert "insufficient credits" in error.lower()
+        assert events is None
+
+    def test_stream_message_disconnect_records_partial_response(self, chat_service, test_user, mock_ml_service):
+        """Test a client disconnect keeps the charge and records what was streamed"""
+        tokens = (t for t in ["Mock", " AI", " response"])
+        mock_ml_service.stream_response.return_value = tokens
+
+        success, error, events = chat_service.stream_message(
+            user=test_user,
+            message="Hello",
+            model_name="Gemma3 1B"
+        )
+
+        assert next(events) == {"token": "Mock"}
+        events.close()
+
+        history = chat_service.get_conversation_history(test_user.id)
+        assert len(history) == 1
+        assert history[0]["response"] == "Mock"
+        assert history[0]["credits_charged"] == 1
+        assert chat_service.billing_service.get_user_balance(test_user.id) == 99
+        # The backend stream is closed too
+        assert next(tokens, None) is None
+
+    def test_stream_message_unstarted_stream_is_not_charged(self, chat_service, test_user, mock_ml_service):
+        """Test closing the events before the first pull charges nothing"""
+        success, error, events = chat_service.stream_message(
+            user=test_user,
+            message="Hello",
+            model_name="Gemma3 1B"
+        )
+
+        assert success is True
+        events.close()
+
+        assert chat_service.billing_service.get_user_balance(test_user.id) == 100
+        mock_ml_service.stream_response.assert_not_called()
+
+    def test_stream_message_checks_credits_before_loading_model(self, chat_service, test_user, mock_ml_service):
+        """Test a user without credits cannot trigger a model load"""
+        chat_service.billing_service.charge_credits(test_user.id, 100)
+        mock_ml_service.is_model_available.return_value = False
+
+        success, error, events = chat_service.stream_message(
+            user=test_user,
+            message="Hello",
+            model_name="Gemma3 4B"
+        )
+
+        assert success is False
+        mock_ml_service.reload_model.assert_not_called()
+
+    def test_estimate_response_costs(self, chat_service):
+        """Test estimating costs for several models"""
+        estimates = chat_service.estimate_response_costs(["Gemma3 1B", "Gemma3 4B"])
+        
+        assert [e["model_name"] for e in estimates] == ["Gemma3 1B", "Gemma3 4B"]
+        assert estimates[0]["cost"] == 1
+        assert estimates[1]["cost"] == 3
+        assert all(e["available"] for e in estimates)
+    
     def test_validate_message_valid(self, chat_service):
         """Test message validation with valid message"""
         is_valid, message = chat_service.validate_message("Hello, how are you?")
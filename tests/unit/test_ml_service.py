@@ -181,7 +181,31 @@ class TestMLService:
         # Test other model (no special formatting)
         formatted = service._format_prompt("Hello", "other_model")
         assert formatted == "Hello"
-    
+
+    def test_encode_chat_prompts(self, mock_ml_service):
+        """Test prompts are wrapped in cached template ids and left-padded"""
+        service = mock_ml_service
+
+        tokenizer = Mock(pad_token_id=0, eos_token_id=2)
+        tokenizer.return_value = {"input_ids": [[7, 8, 9], [7]]}
+        model_data = {
+            "tokenizer": tokenizer,
+            "chat_prefix_ids": [1, 10],
+            "chat_suffix_ids": [11, 12],
+        }
+
+        inputs = service._encode_chat_prompts(model_data, ["long", "short"], "cpu")
+
+        tokenizer.assert_called_once_with(["long", "short"], add_special_tokens=False)
+        assert inputs["input_ids"].tolist() == [
+            [1, 10, 7, 8, 9, 11, 12],
+            [0, 0, 1, 10, 7, 11, 12],
+        ]
+        assert inputs["attention_mask"].tolist() == [
+            [1, 1, 1, 1, 1, 1, 1],
+            [0, 0, 1, 1, 1, 1, 1],
+        ]
+
     def test_clean_response(self, mock_ml_service):
         """Test response cleaning"""
         service = mock_ml_service
@@ -214,7 +238,22 @@ class TestMLService:
         assert info is not None
         assert info["name"] == "gemma3_1b"
         assert info["cost"] == 1
-    
+
+    def test_describe_all(self, mock_ml_service):
+        """Test describing every available model in one call"""
+        service = mock_ml_service
+        service.model_loader.get_model_info.return_value = {
+            "memory_usage_gb": 2.5,
+            "device": "cpu"
+        }
+
+        descriptions = service.describe_all()
+
+        assert len(descriptions) == 2
+        assert descriptions[0]["name"] == "Gemma3 1B"
+        assert descriptions[0]["cost"] == service.get_model_cost("Gemma3 1B")
+        assert all(d["device"] == "cpu" and d["available"] is True for d in descriptions)
+
     def test_get_system_status(self, mock_ml_service):
         """Test getting system status"""
         service = mock_ml_service
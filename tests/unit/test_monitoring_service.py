@@ -195,6 +195,18 @@ class TestMonitoringService:
             assert "Database connectivity issues" in health["issues"]
             assert health["components"]["database"] == "unhealthy"
     
+    def test_get_health_status_from_given_metrics(self, monitoring_service):
+        """Test health status reuses metrics the caller already collected"""
+        with patch.object(monitoring_service, 'get_system_metrics') as mock_metrics:
+            health = monitoring_service.get_health_status({
+                "memory": {"percent": 85.0},
+                "disk": {"percent": 50.0}
+            })
+            
+            mock_metrics.assert_not_called()
+            assert health["status"] == "warning"
+            assert "Elevated memory usage" in health["issues"]
+    
     def test_generate_report_success(self, monitoring_service):
         """Test successful report generation"""
         with patch.object(monitoring_service, 'get_system_metrics') as mock_metrics, \
@@ -0,0 +1,30 @@
+"""
+Unit tests for performance monitoring utilities
+"""
+from app.utils.performance_monitor import RequestTracker
+
+
+class TestRequestTracker:
+    """Test RequestTracker functionality"""
+
+    def test_recorded_requests_appear_in_stats(self):
+        """Test pending records are flushed when stats are read"""
+        tracker = RequestTracker()
+        tracker.record_request("/chat/send", "POST", 120, 200, user_id=1)
+        tracker.record_request("/chat/send", "POST", 80, 500, user_id=1)
+
+        stats = tracker.get_request_stats(60)
+
+        assert stats["total_requests"] == 2
+        assert stats["status_codes"] == {200: 1, 500: 1}
+        assert stats["error_rate"] == 0.5
+
+    def test_slowest_requests_ordered_by_duration(self):
+        """Test slowest requests are returned longest first"""
+        tracker = RequestTracker()
+        for duration in (10, 300, 50):
+            tracker.record_request("/ml/generate", "POST", duration, 200)
+
+        slowest = tracker.get_slowest_requests(limit=2)
+
+        assert [req["duration_ms"] for req in slowest] == [300, 50]
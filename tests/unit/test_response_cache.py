@@ -0,0 +1,50 @@
+"""
+Unit tests for ResponseCache
+"""
+from app.ml.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test ResponseCache functionality"""
+
+    def test_get_returns_cached_response(self):
+        """Test cached response is returned and counted as a hit"""
+        cache = ResponseCache(max_entries=4)
+        key = ("hello", "Gemma3 1B", None, None)
+
+        assert cache.get(key) is None
+        cache.set(key, "hi")
+
+        assert cache.get(key) == "hi"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_parameters_are_part_of_key(self):
+        """Test same prompt with different parameters is a miss"""
+        cache = ResponseCache(max_entries=4)
+        cache.set(("hello", "Gemma3 1B", None, None), "hi")
+
+        assert cache.get(("hello", "Gemma3 1B", None, 0.5)) is None
+        assert cache.get(("hello", "Gemma3 4B", None, None)) is None
+
+    def test_least_recently_used_is_evicted(self):
+        """Test eviction keeps recently read entries"""
+        cache = ResponseCache(max_entries=2)
+        cache.set(("a", "m", None, None), "A")
+        cache.set(("b", "m", None, None), "B")
+        cache.get(("a", "m", None, None))
+        cache.set(("c", "m", None, None), "C")
+
+        assert cache.get(("a", "m", None, None)) == "A"
+        assert cache.get(("b", "m", None, None)) is None
+
+    def test_clear_resets_entries_and_counters(self):
+        """Test clear empties the cache"""
+        cache = ResponseCache(max_entries=2)
+        cache.set(("a", "m", None, None), "A")
+        cache.get(("a", "m", None, None))
+        cache.clear()
+
+        assert cache.stats() == {
+            "total_entries": 0, "max_entries": 2, "hits": 0, "misses": 0, "hit_rate": 0.0
+        }
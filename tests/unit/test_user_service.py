@@ -155,6 +155,14 @@ class TestUserService:
         assert retrieved_user.id == user.id
         assert retrieved_user.username == user.username
     
+    def test_get_user_id_by_token(self, user_service):
+        """Test resolving user id by token without loading the user"""
+        _, _, user = user_service.register_user("testuser", "test@example.com", "TestPass123")
+        _, _, token = user_service.create_user_session(user)
+
+        assert user_service.get_user_id_by_token(token) == user.id
+        assert user_service.get_user_id_by_token("invalid_token") is None
+
     def test_get_user_by_invalid_token(self, user_service):
         """Test getting user by invalid token"""
         user = user_service.get_user_by_token("invalid_token")
@@ -187,6 +195,23 @@ class TestUserService:
         user_info = user_service.get_user_info(user.id)
         assert user_info["credits"] == 50
     
+    def test_add_credits(self, user_service):
+        """Test atomically adding user credits"""
+        # Register user
+        _, _, user = user_service.register_user("testuser", "test@example.com", "TestPass123")
+        
+        # Add credits
+        new_credits = user_service.add_credits(user.id, 25)
+        assert new_credits == 125
+        
+        # Verify credits updated
+        user_info = user_service.get_user_info(user.id)
+        assert user_info["credits"] == 125
+    
+    def test_add_credits_user_not_found(self, user_service):
+        """Test adding credits for non-existent user"""
+        assert user_service.add_credits(999, 25) is None
+    
     def test_get_user_info(self, user_service):
         """Test getting user info"""
         # Register user